@@ -0,0 +1,150 @@
+import asyncio
+import time
+from urllib.parse import urlsplit, urlunsplit
+
+DEFAULT_PORTS = {'http': 80, 'https': 443}
+
+
+def normalize_url(url):
+    """
+    Canonical form of a URL for de-duplication: fragment dropped, scheme and
+    host lowercased, default port removed and an empty path turned into '/'.
+    """
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    netloc = parts.netloc
+    try:
+        port = parts.port
+    except ValueError:
+        port = None
+        netloc = netloc.lower()
+    else:
+        host = parts.hostname or ''
+        if ':' in host:
+            host = f'[{host}]'
+        userinfo = netloc.rpartition('@')[0]
+        netloc = f'{userinfo}@{host}' if userinfo else host
+        if port is not None and port != DEFAULT_PORTS.get(scheme):
+            netloc += f':{port}'
+    path = parts.path
+    if netloc and not path:
+        path = '/'
+    return urlunsplit((scheme, netloc, path, parts.query, ''))
+
+
+class CrawledPage:
+    """One URL of a crawl, filled in as it is fetched and processed."""
+
+    def __init__(self, url, depth):
+        self.url = url
+        self.depth = depth
+        self.page = None
+        self.error = None
+        self.validators = {}
+        self.result = None
+        self.skipped = False
+
+
+class FrontierCrawler:
+    """
+    Breadth-first crawl from a start page with an asyncio frontier queue.
+
+    fetch(url) -> (page, error, validators, size) and process(crawled) are
+    blocking and run in worker threads, so pages are fetched and processed
+    in parallel: at most max_fetches at once and per_host per host.
+    select_links(page, depth) returns the candidate links of a fetched page in
+    the order they should be crawled; links are de-duplicated by normalize_url.
+    process runs for every fetched page below the start page, including
+    not-modified and failed fetches (page None, error set).
+
+    Budgets: max_depth levels below the start page, max_pages pages besides the
+    start page, and no new fetch once time_budget seconds have passed or
+    byte_budget bytes have been downloaded.
+    """
+
+    def __init__(self, fetch, select_links, process=None, max_depth=1, max_pages=5,
+                 time_budget=None, byte_budget=None, max_fetches=8, per_host=2):
+        self.fetch = fetch
+        self.select_links = select_links
+        self.process = process
+        self.max_depth = max_depth
+        self.max_pages = max_pages
+        self.time_budget = time_budget
+        self.byte_budget = byte_budget
+        self.max_fetches = max(1, max_fetches)
+        self.per_host = max(1, per_host)
+
+    def crawl(self, start_url):
+        """
+        Returns:
+            tuple: (CrawledPage of the start page, list of CrawledPage in the order they were discovered)
+        """
+        return asyncio.run(self._crawl(start_url))
+
+    async def _crawl(self, start_url):
+        self._deadline = time.monotonic() + self.time_budget if self.time_budget else None
+        self._bytes = 0
+        self._fetch_slots = asyncio.Semaphore(self.max_fetches)
+        self._host_slots = {}
+        self._seen = {normalize_url(start_url)}
+        self._pages = []
+
+        queue = asyncio.Queue()
+        start = CrawledPage(start_url, 0)
+        queue.put_nowait(start)
+        workers = [asyncio.create_task(self._worker(queue)) for _ in range(self.max_fetches)]
+        await queue.join()
+        for worker in workers:
+            worker.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+        return start, self._pages
+
+    def _host_slot(self, url):
+        host = urlsplit(url).netloc.lower()
+        slot = self._host_slots.get(host)
+        if slot is None:
+            slot = asyncio.Semaphore(self.per_host)
+            self._host_slots[host] = slot
+        return slot
+
+    def _budget_exhausted(self):
+        if self._deadline is not None and time.monotonic() >= self._deadline:
+            return True
+        return self.byte_budget is not None and self._bytes >= self.byte_budget
+
+    async def _worker(self, queue):
+        while True:
+            crawled = await queue.get()
+            try:
+                await self._visit(crawled, queue)
+            except Exception as e:
+                crawled.error = str(e)
+            finally:
+                queue.task_done()
+
+    async def _visit(self, crawled, queue):
+        # Take the host slot first so a busy host doesn't hold a global slot while waiting
+        async with self._host_slot(crawled.url):
+            async with self._fetch_slots:
+                if crawled.depth > 0 and self._budget_exhausted():
+                    crawled.skipped = True
+                    return
+                page, error, validators, size = await asyncio.to_thread(self.fetch, crawled.url)
+        self._bytes += size
+        crawled.page, crawled.error, crawled.validators = page, error, validators
+
+        # Not-modified and failed fetches have no links to follow, but still go to process
+        if page is not None and crawled.depth < self.max_depth:
+            for link in self.select_links(page, crawled.depth):
+                if len(self._pages) >= self.max_pages:
+                    break
+                key = normalize_url(link)
+                if key in self._seen:
+                    continue
+                self._seen.add(key)
+                child = CrawledPage(key, crawled.depth + 1)
+                self._pages.append(child)
+                queue.put_nowait(child)
+
+        if self.process is not None and crawled.depth > 0:
+            crawled.result = await asyncio.to_thread(self.process, crawled)
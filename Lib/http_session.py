@@ -0,0 +1,92 @@
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# urllib3 only decodes brotli when one of the brotli packages is installed
+try:
+    import brotli  # noqa: F401
+    ACCEPT_ENCODING = 'gzip, deflate, br'
+except ImportError:
+    try:
+        import brotlicffi  # noqa: F401
+        ACCEPT_ENCODING = 'gzip, deflate, br'
+    except ImportError:
+        ACCEPT_ENCODING = 'gzip, deflate'
+
+DEFAULT_POOL_SIZE = 10
+# Number of per-host pools kept alive at once
+DEFAULT_MAX_HOSTS = 100
+
+
+class FetchClient:
+    """
+    Shared HTTP client with a keep-alive connection pool per host.
+    Safe to use from several threads at once.
+    """
+
+    def __init__(self, pool_size=DEFAULT_POOL_SIZE, max_hosts=DEFAULT_MAX_HOSTS):
+        self.pool_size = pool_size
+        self.session = requests.Session()
+        self.session.headers['Accept-Encoding'] = ACCEPT_ENCODING
+        self._adapter = HTTPAdapter(pool_connections=max_hosts, pool_maxsize=pool_size)
+        self.session.mount('http://', self._adapter)
+        self.session.mount('https://', self._adapter)
+
+    def get(self, url, headers=None, timeout=30):
+        return self.session.get(url, headers=headers, timeout=timeout)
+
+    def stats(self):
+        """
+        Collect connection reuse numbers from the underlying urllib3 pools.
+        Returns:
+            dict: host -> {"requests": int, "connections": int}
+        """
+        stats = {}
+        pools = self._adapter.poolmanager.pools
+        for key in list(pools.keys()):
+            pool = pools.get(key)
+            if pool is None:
+                continue
+            host_stats = stats.setdefault(pool.host, {"requests": 0, "connections": 0})
+            host_stats["requests"] += pool.num_requests
+            host_stats["connections"] += pool.num_connections
+        return stats
+
+    def print_stats(self):
+        stats = self.stats()
+        if not stats:
+            print("[INFO] HTTP client: no requests made")
+            return
+        total_requests = sum(s["requests"] for s in stats.values())
+        total_connections = sum(s["connections"] for s in stats.values())
+        print(f"[INFO] HTTP client: {total_requests} requests over {total_connections} connections "
+              f"({total_requests - total_connections} reused)")
+        for host in sorted(stats):
+            s = stats[host]
+            print(f"  - {host}: {s['requests']} requests, {s['connections']} connections")
+
+    def close(self):
+        self.session.close()
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def configure_fetch_client(pool_size=DEFAULT_POOL_SIZE):
+    """Replace the shared client, e.g. to change the pool size before a run."""
+    global _client
+    with _client_lock:
+        if _client is not None:
+            _client.close()
+        _client = FetchClient(pool_size=pool_size)
+    return _client
+
+
+def get_fetch_client():
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = FetchClient()
+        return _client
@@ -0,0 +1,68 @@
+import re
+
+# Standard pages to exclude from crawling
+EXCLUDED_PATTERNS = [
+    # Legal & Company
+    'impressum', 'imprint', 'privacy', 'datenschutz', 'agb', 'terms',
+    'kontakt', 'contact', 'about', 'uber-uns', 'team',
+    # Navigation & Utils
+    'suche', 'search', 'login', 'register', 'anmelden', 'registrieren',
+    'sitemap', 'archive', 'archiv', 'feeds', 'rss',
+    # Social Media
+    'facebook', 'twitter', 'instagram', 'linkedin', 'youtube',
+    # Shopping
+    'warenkorb', 'cart', 'checkout', 'shop', 'store',
+    # Account
+    'profile', 'profil', 'account', 'konto', 'settings', 'einstellungen',
+    # Newsletter
+    'newsletter', 'subscribe', 'abonnieren',
+    # Help
+    'help', 'hilfe', 'faq', 'support'
+]
+
+# Matches nothing, so an empty keyword list never marks a link as relevant
+_NEVER = re.compile(r'(?!)')
+
+
+def compile_substrings(substrings):
+    """
+    One regex that finds any of the given substrings, literally.
+    Searching it is equivalent to any(s in text for s in substrings).
+    """
+    substrings = sorted(set(substrings), key=len, reverse=True)
+    if not substrings:
+        return _NEVER
+    return re.compile('|'.join(re.escape(s) for s in substrings))
+
+
+class LinkMatcher:
+    """
+    Excluded-page and keyword checks for the links of one source, compiled once.
+    is_excluded(url) == any(p in url.lower() for p in excluded_patterns)
+    is_relevant(url) == not is_excluded(url) and any(k.lower() in url.lower() for k in keywords)
+    """
+
+    def __init__(self, keywords, excluded_patterns=EXCLUDED_PATTERNS):
+        self._excluded = compile_substrings(excluded_patterns)
+        self._keywords = compile_substrings(keyword.lower() for keyword in keywords)
+
+    def is_excluded(self, url):
+        return self._excluded.search(url.lower()) is not None
+
+    def is_relevant(self, url):
+        url_lower = url.lower()
+        if self._excluded.search(url_lower) is not None:
+            return False
+        return self._keywords.search(url_lower) is not None
+
+    def filter_links(self, links):
+        """Split links into (not excluded, relevant), lowercasing each URL once."""
+        valid, relevant = [], []
+        for link in links:
+            url_lower = link.lower()
+            if self._excluded.search(url_lower) is not None:
+                continue
+            valid.append(link)
+            if self._keywords.search(url_lower) is not None:
+                relevant.append(link)
+        return valid, relevant
@@ -0,0 +1,212 @@
+import asyncio
+import atexit
+import os
+import random
+import threading
+import time
+import weakref
+
+DEFAULT_MAX_IN_FLIGHT = 8
+DEFAULT_MAX_RETRIES = 5
+DEFAULT_REQUESTS_PER_MINUTE = {
+    'openai': 500,
+    'anthropic': 50
+}
+# Rate limited, overloaded or server side errors are worth another attempt
+RETRY_STATUS_CODES = {408, 409, 429, 500, 502, 503, 504, 529}
+
+
+class TokenBucket:
+    """
+    Allows `rate` acquisitions per second on average, with bursts up to `capacity`.
+    Only used from a single event loop, so no locking is needed.
+    """
+
+    def __init__(self, rate, capacity=None):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+
+    async def acquire(self):
+        while True:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return
+            await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+def _status_code(error):
+    status = getattr(error, 'status_code', None)
+    if status is None:
+        response = getattr(error, 'response', None)
+        status = getattr(response, 'status_code', None)
+    return status
+
+
+def _is_retryable(error):
+    status = _status_code(error)
+    if status is not None:
+        return status in RETRY_STATUS_CODES
+    # Connection resets and timeouts carry no status code
+    return type(error).__name__ in ('APIConnectionError', 'APITimeoutError')
+
+
+def _retry_after(error):
+    response = getattr(error, 'response', None)
+    headers = getattr(response, 'headers', None) or {}
+    try:
+        return float(headers.get('retry-after'))
+    except (TypeError, ValueError):
+        return None
+
+
+class AsyncLLMClient:
+    """
+    Shared async OpenAI / Anthropic client for one event loop.
+    Limits the number of requests in flight, rate limits each provider with
+    a token bucket and retries 429/5xx responses with exponential backoff.
+    """
+
+    def __init__(self, max_in_flight=DEFAULT_MAX_IN_FLIGHT, requests_per_minute=None,
+                 max_retries=DEFAULT_MAX_RETRIES, base_delay=1.0, max_delay=60.0):
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._requests_per_minute = dict(DEFAULT_REQUESTS_PER_MINUTE)
+        self._requests_per_minute.update(requests_per_minute or {})
+        self._in_flight = asyncio.Semaphore(max_in_flight)
+        self._buckets = {}
+        self._clients = {}
+
+    def _bucket(self, provider):
+        bucket = self._buckets.get(provider)
+        if bucket is None:
+            per_minute = self._requests_per_minute.get(provider, 60)
+            bucket = TokenBucket(per_minute / 60.0)
+            self._buckets[provider] = bucket
+        return bucket
+
+    def _client(self, provider):
+        client = self._clients.get(provider)
+        if client is None:
+            # Retries are handled here, so the SDK's own retry loop is switched off
+            if provider == 'openai':
+                from openai import AsyncOpenAI
+                client = AsyncOpenAI(api_key=os.environ.get("OPENAI_API_KEY"), max_retries=0)
+            elif provider == 'anthropic':
+                from anthropic import AsyncAnthropic
+                client = AsyncAnthropic(api_key=os.environ.get("ANTHROPIC_API_KEY"), max_retries=0)
+            else:
+                raise ValueError(f"Unsupported provider: {provider}")
+            self._clients[provider] = client
+        return client
+
+    async def _request(self, provider, model, system_message, user_message):
+        client = self._client(provider)
+        if provider == 'openai':
+            response = await client.chat.completions.create(
+                model=model,
+                messages=[
+                    {"role": "system", "content": system_message},
+                    {"role": "user", "content": user_message}
+                ]
+            )
+            return response.choices[0].message.content
+        response = await client.messages.create(
+            model=model,
+            max_tokens=4096,
+            system=system_message,
+            messages=[{"role": "user", "content": user_message}]
+        )
+        return response.content[0].text
+
+    async def complete(self, provider, model, system_message, user_message):
+        """Send one chat completion; raises the last error once retries are exhausted."""
+        bucket = self._bucket(provider)
+        for attempt in range(self.max_retries + 1):
+            await bucket.acquire()
+            try:
+                async with self._in_flight:
+                    return await self._request(provider, model, system_message, user_message)
+            except Exception as e:
+                if attempt == self.max_retries or not _is_retryable(e):
+                    raise
+                delay = _retry_after(e)
+                if delay is None:
+                    delay = min(self.max_delay, self.base_delay * 2 ** attempt)
+                    delay *= 0.5 + random.random() / 2
+                print(f"[DEBUG] {provider} request failed ({e}), retrying in {delay:.1f}s")
+                await asyncio.sleep(delay)
+
+    async def aclose(self):
+        """Close the SDK clients and their connection pools."""
+        clients, self._clients = self._clients, {}
+        for client in clients.values():
+            await client.close()
+
+
+# One client per event loop: the SDK clients hold connections bound to the loop they were first used on
+_clients = weakref.WeakKeyDictionary()
+
+
+def get_async_llm_client(settings=None):
+    """
+    Return the shared client for the running event loop.
+    settings: the 'llm_async' config section, used when the client is first created
+    """
+    loop = asyncio.get_running_loop()
+    client = _clients.get(loop)
+    if client is None:
+        settings = settings or {}
+        client = AsyncLLMClient(
+            max_in_flight=settings.get('max_in_flight', DEFAULT_MAX_IN_FLIGHT),
+            requests_per_minute=settings.get('requests_per_minute'),
+            max_retries=settings.get('max_retries', DEFAULT_MAX_RETRIES)
+        )
+        _clients[loop] = client
+    return client
+
+
+async def close_async_llm_client():
+    """Close the running event loop's shared client, if it has one."""
+    client = _clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
+
+
+# Synchronous callers all run their requests on this one loop, so they share one
+# client and with it the in-flight limit and the rate limit of each provider
+_loop = None
+_loop_lock = threading.Lock()
+
+
+def _get_loop():
+    global _loop
+    with _loop_lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            threading.Thread(target=_loop.run_forever, name="llm-async", daemon=True).start()
+            atexit.register(_stop_loop)
+        return _loop
+
+
+def run_llm_coroutine(coroutine):
+    """Run coroutine on the process-wide LLM event loop and wait for its result; callable from any thread."""
+    return asyncio.run_coroutine_threadsafe(coroutine, _get_loop()).result()
+
+
+def _stop_loop():
+    global _loop
+    with _loop_lock:
+        loop, _loop = _loop, None
+    if loop is None:
+        return
+    try:
+        asyncio.run_coroutine_threadsafe(close_async_llm_client(), loop).result(timeout=10)
+    except Exception as e:
+        print(f"[WARNING] Could not close the LLM clients: {e}")
+    loop.call_soon_threadsafe(loop.stop)
@@ -0,0 +1,131 @@
+import io
+import json
+import time
+
+from Lib.pdf_audio_tools.clients import get_openai_client, get_anthropic_client
+
+DEFAULT_POLL_INTERVAL = 30
+DEFAULT_BATCH_TIMEOUT_HOURS = 24
+_OPENAI_DONE = {'completed', 'failed', 'expired', 'cancelled'}
+
+
+def _custom_id(index):
+    # Anthropic only accepts [a-zA-Z0-9_-]{1,64}
+    return f"request-{index}"
+
+
+def _submit_openai(model, prompts):
+    lines = []
+    for index, (system_message, user_message) in enumerate(prompts):
+        lines.append(json.dumps({
+            "custom_id": _custom_id(index),
+            "method": "POST",
+            "url": "/v1/chat/completions",
+            "body": {
+                "model": model,
+                "messages": [
+                    {"role": "system", "content": system_message},
+                    {"role": "user", "content": user_message}
+                ]
+            }
+        }))
+    client = get_openai_client()
+    input_file = client.files.create(
+        file=("ai-news-batch.jsonl", io.BytesIO("\n".join(lines).encode('utf-8'))),
+        purpose="batch"
+    )
+    batch = client.batches.create(
+        input_file_id=input_file.id,
+        endpoint="/v1/chat/completions",
+        completion_window="24h"
+    )
+    return batch.id
+
+
+def _poll_openai(batch_id):
+    """Returns None while the batch is running, else {custom_id: answer}."""
+    client = get_openai_client()
+    batch = client.batches.retrieve(batch_id)
+    if batch.status not in _OPENAI_DONE:
+        return None
+    if batch.status != 'completed':
+        print(f"[ERROR] OpenAI batch {batch_id} ended with status {batch.status}")
+    answers = {}
+    if batch.output_file_id:
+        for line in client.files.content(batch.output_file_id).text.splitlines():
+            if not line.strip():
+                continue
+            entry = json.loads(line)
+            response = entry.get("response") or {}
+            if response.get("status_code") == 200:
+                answers[entry["custom_id"]] = response["body"]["choices"][0]["message"]["content"]
+            else:
+                print(f"[ERROR] Batch request {entry.get('custom_id')} failed: {entry.get('error') or response}")
+    return answers
+
+
+def _submit_anthropic(model, prompts):
+    batch = get_anthropic_client().messages.batches.create(requests=[
+        {
+            "custom_id": _custom_id(index),
+            "params": {
+                "model": model,
+                "max_tokens": 4096,
+                "system": system_message,
+                "messages": [{"role": "user", "content": user_message}]
+            }
+        }
+        for index, (system_message, user_message) in enumerate(prompts)
+    ])
+    return batch.id
+
+
+def _poll_anthropic(batch_id):
+    client = get_anthropic_client()
+    batch = client.messages.batches.retrieve(batch_id)
+    if batch.processing_status != 'ended':
+        return None
+    answers = {}
+    for entry in client.messages.batches.results(batch_id):
+        if entry.result.type == 'succeeded':
+            answers[entry.custom_id] = entry.result.message.content[0].text
+        else:
+            print(f"[ERROR] Batch request {entry.custom_id} {entry.result.type}")
+    return answers
+
+
+_PROVIDERS = {
+    'openai': (_submit_openai, _poll_openai),
+    'anthropic': (_submit_anthropic, _poll_anthropic),
+}
+
+
+def run_batch(provider, model, prompts, poll_interval=DEFAULT_POLL_INTERVAL,
+              timeout_hours=DEFAULT_BATCH_TIMEOUT_HOURS):
+    """
+    Send (system_message, user_message) prompts through the provider's batch API
+    and wait for the results.
+    Returns:
+        list: Answers in prompt order, None for requests that failed or didn't finish in time
+    """
+    if not prompts:
+        return []
+    if provider not in _PROVIDERS:
+        raise ValueError(f"Unsupported provider: {provider}")
+    submit, poll = _PROVIDERS[provider]
+
+    batch_id = submit(model, prompts)
+    print(f"[INFO] Submitted {provider} batch {batch_id} with {len(prompts)} requests")
+    deadline = time.monotonic() + timeout_hours * 3600
+    while True:
+        answers = poll(batch_id)
+        if answers is not None:
+            break
+        if time.monotonic() >= deadline:
+            print(f"[ERROR] Batch {batch_id} did not finish within {timeout_hours}h")
+            answers = {}
+            break
+        print(f"[DEBUG] Batch {batch_id} still running, checking again in {poll_interval}s")
+        time.sleep(poll_interval)
+    print(f"[INFO] Batch {batch_id} finished, {len(answers)} of {len(prompts)} requests succeeded")
+    return [answers.get(_custom_id(index)) for index in range(len(prompts))]
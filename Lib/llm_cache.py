@@ -0,0 +1,154 @@
+import atexit
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+
+DEFAULT_TTL_HOURS = 24 * 7
+DEFAULT_MAX_ENTRIES = 5000
+
+
+def make_cache_key(provider, model, system_message, user_message):
+    """Content address of an LLM request: sha256 over provider, model and both messages."""
+    digest = hashlib.sha256()
+    for part in (provider, model, system_message, user_message):
+        data = (part or "").encode('utf-8')
+        # Length prefix so ("ab", "c") and ("a", "bc") can't collide
+        digest.update(len(data).to_bytes(8, 'big'))
+        digest.update(data)
+    return digest.hexdigest()
+
+
+class LLMCache:
+    """
+    On-disk cache of LLM answers in a single SQLite file.
+    Entries expire after ttl_seconds; once more than max_entries are stored,
+    the least recently used ones are evicted.
+    Hits are served from memory when possible, and last-use times are
+    written back in batches so a hit never waits for the disk.
+    """
+
+    def __init__(self, path, ttl_seconds=DEFAULT_TTL_HOURS * 3600, max_entries=DEFAULT_MAX_ENTRIES):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._memory = {}   # key -> (created, response)
+        self._touched = {}  # key -> last_used, not yet written to disk
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                response TEXT NOT NULL,
+                created REAL NOT NULL,
+                last_used REAL NOT NULL
+            )""")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS responses_last_used ON responses(last_used)")
+        self._conn.execute("DELETE FROM responses WHERE created < ?", (time.time() - ttl_seconds,))
+        self._conn.commit()
+        self._count = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+    def get(self, key):
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is None:
+                row = self._conn.execute(
+                    "SELECT created, response FROM responses WHERE key = ?", (key,)).fetchone()
+                if row is not None:
+                    entry = (row[0], row[1])
+                    self._memory[key] = entry
+            if entry is None or entry[0] < now - self.ttl_seconds:
+                self.misses += 1
+                return None
+            self._touched[key] = now
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key, response):
+        now = time.time()
+        with self._lock:
+            self._memory[key] = (now, response)
+            self._touched.pop(key, None)
+            existed = self._conn.execute(
+                "SELECT 1 FROM responses WHERE key = ?", (key,)).fetchone() is not None
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, response, created, last_used) VALUES (?, ?, ?, ?)",
+                (key, response, now, now))
+            if not existed:
+                self._count += 1
+            self._flush_touched()
+            if self._count > self.max_entries:
+                self._evict(self._count - self.max_entries)
+            self._conn.commit()
+
+    def _flush_touched(self):
+        if self._touched:
+            self._conn.executemany(
+                "UPDATE responses SET last_used = ? WHERE key = ?",
+                [(last_used, key) for key, last_used in self._touched.items()])
+            self._touched.clear()
+
+    def _evict(self, count):
+        rows = self._conn.execute(
+            "SELECT key FROM responses ORDER BY last_used LIMIT ?", (count,)).fetchall()
+        self._conn.executemany("DELETE FROM responses WHERE key = ?", rows)
+        for (key,) in rows:
+            self._memory.pop(key, None)
+        self._count -= len(rows)
+
+    def flush(self):
+        """Write the batched last-use times."""
+        with self._lock:
+            self._flush_touched()
+            self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._flush_touched()
+            self._conn.commit()
+            self._conn.close()
+
+
+_caches = {}
+_caches_lock = threading.Lock()
+_bypass = False
+
+
+def set_llm_cache_bypass(bypass=True):
+    """Disable (or re-enable) cache lookups and stores for the whole process."""
+    global _bypass
+    _bypass = bypass
+
+
+def get_llm_cache(path, ttl_hours=DEFAULT_TTL_HOURS, max_entries=DEFAULT_MAX_ENTRIES):
+    """
+    Return the shared cache stored at path, or None while the cache is bypassed.
+    """
+    if _bypass:
+        return None
+    path = os.path.abspath(path)
+    with _caches_lock:
+        cache = _caches.get(path)
+        if cache is None:
+            cache = LLMCache(path, ttl_seconds=ttl_hours * 3600, max_entries=max_entries)
+            _caches[path] = cache
+        return cache
+
+
+def flush_llm_caches():
+    """Write the batched updates of every open cache, e.g. after each run of a long-lived process."""
+    with _caches_lock:
+        for cache in _caches.values():
+            cache.flush()
+
+
+@atexit.register
+def _close_caches():
+    with _caches_lock:
+        for cache in _caches.values():
+            cache.close()
+        _caches.clear()
@@ -0,0 +1,184 @@
+import atexit
+import datetime
+import hashlib
+import math
+import os
+import struct
+import threading
+
+DEFAULT_WINDOW_DAYS = 7
+DEFAULT_LINES_PER_DAY = 100000
+DEFAULT_FALSE_POSITIVE_RATE = 0.001
+
+# Header of a persisted filter: number of bits, number of hash functions
+_HEADER = struct.Struct('<QI')
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter over byte strings, using double hashing of one blake2b digest."""
+
+    def __init__(self, num_bits, num_hashes, bits=None):
+        self.num_bits = num_bits
+        self.num_hashes = num_hashes
+        self.bits = bits if bits is not None else bytearray((num_bits + 7) // 8)
+
+    @classmethod
+    def for_capacity(cls, capacity, false_positive_rate):
+        num_bits = max(8, int(-capacity * math.log(false_positive_rate) / math.log(2) ** 2))
+        num_hashes = max(1, round(num_bits / capacity * math.log(2)))
+        return cls(num_bits, num_hashes)
+
+    def _positions(self, data):
+        digest = hashlib.blake2b(data, digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return [(h1 + i * h2) % self.num_bits for i in range(self.num_hashes)]
+
+    def add(self, data):
+        for position in self._positions(data):
+            self.bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, data):
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(data))
+
+    def to_bytes(self):
+        return _HEADER.pack(self.num_bits, self.num_hashes) + bytes(self.bits)
+
+    @classmethod
+    def from_bytes(cls, data):
+        """Raises ValueError for data that isn't a complete filter, e.g. a truncated file."""
+        try:
+            num_bits, num_hashes = _HEADER.unpack_from(data)
+        except struct.error as e:
+            raise ValueError(f"Bloom filter header unreadable: {e}") from None
+        bits = bytearray(data[_HEADER.size:])
+        if num_bits < 1 or num_hashes < 1 or len(bits) != (num_bits + 7) // 8:
+            raise ValueError(f"Bloom filter of {num_bits} bits can't have {len(bits)} bytes of data")
+        return cls(num_bits, num_hashes, bits)
+
+
+class NoveltyIndex:
+    """
+    Lines already sent to the LLM from any source during the last window_days.
+    One Bloom filter per day keeps memory bounded: filters older than the
+    window are dropped, and each holds lines_per_day lines at the given
+    false positive rate (a false positive drops a line that was actually new).
+    Filters are persisted as one <date>.bloom file per day in directory.
+    """
+
+    def __init__(self, directory, window_days=DEFAULT_WINDOW_DAYS, lines_per_day=DEFAULT_LINES_PER_DAY,
+                 false_positive_rate=DEFAULT_FALSE_POSITIVE_RATE):
+        self.directory = directory
+        self.window_days = max(1, window_days)
+        self.lines_per_day = lines_per_day
+        self.false_positive_rate = false_positive_rate
+        self._lock = threading.Lock()
+        self._filters = {}  # ISO date -> BloomFilter
+        self._dirty = set()
+        os.makedirs(directory, exist_ok=True)
+        for filename in os.listdir(directory):
+            if filename.endswith('.bloom'):
+                self._load(filename[:-len('.bloom')])
+
+    def _load(self, day):
+        path = os.path.join(self.directory, f"{day}.bloom")
+        try:
+            with open(path, 'rb') as f:
+                self._filters[day] = BloomFilter.from_bytes(f.read())
+        except (OSError, ValueError) as e:
+            # The lines of that day count as new again; the empty filter replaces the file on the next save
+            print(f"[WARNING] Novelty filter {path} could not be loaded ({e}), starting it over")
+            self._filters[day] = BloomFilter.for_capacity(self.lines_per_day, self.false_positive_rate)
+            self._dirty.add(day)
+
+    def _rotate(self):
+        """Create today's filter if needed and drop the ones that fell out of the window; returns today's key."""
+        today = datetime.date.today()
+        oldest = (today - datetime.timedelta(days=self.window_days - 1)).isoformat()
+        for day in [day for day in self._filters if day < oldest]:
+            del self._filters[day]
+            self._dirty.discard(day)
+            path = os.path.join(self.directory, f"{day}.bloom")
+            if os.path.exists(path):
+                os.remove(path)
+        today = today.isoformat()
+        if today not in self._filters:
+            self._filters[today] = BloomFilter.for_capacity(self.lines_per_day, self.false_positive_rate)
+        return today
+
+    def new_lines(self, text):
+        """
+        The lines of text not seen within the window; nothing is recorded.
+        Call record() with the lines once they have been analysed, so content
+        whose analysis failed is offered again on the next run.
+        Like get_content_diff, a line repeated within text is kept every time.
+        Returns:
+            str: The remaining non-empty lines, joined with newlines
+        """
+        kept = []
+        with self._lock:
+            self._rotate()
+            filters = list(self._filters.values())
+            for line in text.split('\n'):
+                line = line.strip()
+                if not line:
+                    continue
+                data = line.encode('utf-8')
+                if any(data in bloom for bloom in filters):
+                    continue
+                kept.append(line)
+        return '\n'.join(kept)
+
+    def record(self, text):
+        """Remember the non-empty lines of text as sent to the LLM today."""
+        with self._lock:
+            day = self._rotate()
+            today = self._filters[day]
+            for line in text.split('\n'):
+                line = line.strip()
+                if line:
+                    today.add(line.encode('utf-8'))
+                    self._dirty.add(day)
+
+    def save(self):
+        with self._lock:
+            for day in self._dirty:
+                path = os.path.join(self.directory, f"{day}.bloom")
+                # Write to a temporary file first so an interrupted save can't corrupt the filter
+                with open(path + '.tmp', 'wb') as f:
+                    f.write(self._filters[day].to_bytes())
+                os.replace(path + '.tmp', path)
+            self._dirty.clear()
+
+
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+
+def get_novelty_index(config, state_directory):
+    """Return the shared index configured under 'novelty', or None if it is disabled."""
+    novelty_config = config.get('novelty', {})
+    if not novelty_config.get('enabled', True):
+        return None
+    directory = os.path.abspath(novelty_config.get('path') or os.path.join(state_directory, 'novelty'))
+    with _indexes_lock:
+        index = _indexes.get(directory)
+        if index is None:
+            index = NoveltyIndex(
+                directory,
+                window_days=novelty_config.get('window_days', DEFAULT_WINDOW_DAYS),
+                lines_per_day=novelty_config.get('lines_per_day', DEFAULT_LINES_PER_DAY),
+                false_positive_rate=novelty_config.get('false_positive_rate', DEFAULT_FALSE_POSITIVE_RATE)
+            )
+            _indexes[directory] = index
+        return index
+
+
+def save_novelty_indexes():
+    """Persist every open index, e.g. after each run of a long-lived process."""
+    with _indexes_lock:
+        for index in _indexes.values():
+            index.save()
+
+
+atexit.register(save_novelty_indexes)
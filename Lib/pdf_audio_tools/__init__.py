@@ -0,0 +1,43 @@
+"""
+Shared helpers for the news, reader and audio scripts.
+
+The functions live in submodules (fetch, html, llm, tts, audio, state, config, pdf)
+that are only imported when one of their names is first used, so a script that
+needs chunk_to_speech doesn't pay for bs4, anthropic or PyPDF2.
+"""
+import importlib
+
+_SUBMODULES = {
+    'audio': ['play_audio', 'play_audio_stream'],
+    'clients': ['get_openai_client', 'get_anthropic_client'],
+    'config': ['BASE_DIR', 'resolve_config_path', 'load_config', 'get_config'],
+    'fetch': ['NOT_MODIFIED', 'get_website_content', 'get_validators',
+              'get_conditional_headers', 'get_website_content_conditional'],
+    'html': ['clean_html', 'extract_text', 'set_html_backend', 'parse_page', 'ParsedPage'],
+    'llm': ['get_response_cache', 'get_model_settings', 'call_gpt', 'call_gpt_async',
+            'call_gpt_many', 'call_gpt_batch', 'build_analysis_prompt', 'limit_analysis_content',
+            'get_gpt4_analysis', 'get_gpt4_analysis_batch'],
+    'pdf': ['get_random_pdf', 'extract_text_from_pdf'],
+    'state': ['LineHashSet', 'hash_content', 'get_state_directory', 'get_state_filename',
+              'get_state_database_path', 'set_state_backend', 'load_previous_content',
+              'save_current_content', 'get_content_diff'],
+    'tts': ['split_for_speech', 'text_to_speech', 'iter_speech', 'chunk_to_speech'],
+}
+
+_SUBMODULE_OF = {name: module for module, names in _SUBMODULES.items() for name in names}
+
+__all__ = sorted(_SUBMODULE_OF)
+
+
+def __getattr__(name):
+    module = _SUBMODULE_OF.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f"{__name__}.{module}"), name)
+    # Cache on the package so the next lookup is a plain attribute access
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
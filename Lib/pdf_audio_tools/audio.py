@@ -0,0 +1,55 @@
+import io
+from pydub import AudioSegment
+from pydub.playback import play
+
+def play_audio(audio_contents, output_filename="output.mp3"):
+    print("[DEBUG] Processing audio")
+    if audio_contents:
+        try:
+            combined_audio = AudioSegment.empty()
+            for content in audio_contents:
+                audio = AudioSegment.from_mp3(io.BytesIO(content))
+                combined_audio += audio
+            
+            # Save the audio file
+            combined_audio.export(output_filename, format="mp3")
+            print(f"[DEBUG] Audio saved as {output_filename}")
+            
+            # Play the audio
+            print("[DEBUG] Playing audio")
+            play(combined_audio)
+            
+            return output_filename
+        except Exception as e:
+            print(f"[DEBUG] Error processing or playing audio: {e}")
+            return None
+    else:
+        print("[DEBUG] No audio content to process")
+        return None
+
+def play_audio_stream(audio_chunks, output_filename="output.mp3"):
+    """
+    Like play_audio, but plays each chunk as soon as audio_chunks yields it
+    (e.g. from iter_speech) instead of waiting for all of them.
+    The whole recording is saved to output_filename once playback is done.
+    """
+    print("[DEBUG] Processing audio stream")
+    combined_audio = AudioSegment.empty()
+    played = 0
+    try:
+        for content in audio_chunks:
+            audio = AudioSegment.from_mp3(io.BytesIO(content))
+            combined_audio += audio
+            played += 1
+            print(f"[DEBUG] Playing audio chunk {played}")
+            play(audio)
+    except Exception as e:
+        print(f"[DEBUG] Error processing or playing audio: {e}")
+        return None
+
+    if not played:
+        print("[DEBUG] No audio content to process")
+        return None
+    combined_audio.export(output_filename, format="mp3")
+    print(f"[DEBUG] Audio saved as {output_filename}")
+    return output_filename
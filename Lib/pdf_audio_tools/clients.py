@@ -0,0 +1,26 @@
+import os
+import threading
+
+_openai_client = None
+_anthropic_client = None
+_lock = threading.Lock()
+
+
+def get_openai_client():
+    """Create the OpenAI client on first use; importing openai is expensive."""
+    global _openai_client
+    with _lock:
+        if _openai_client is None:
+            from openai import OpenAI
+            _openai_client = OpenAI(api_key=os.environ.get("OPENAI_API_KEY"))
+        return _openai_client
+
+
+def get_anthropic_client():
+    """Create the Anthropic client on first use."""
+    global _anthropic_client
+    with _lock:
+        if _anthropic_client is None:
+            import anthropic
+            _anthropic_client = anthropic.Anthropic(api_key=os.environ.get("ANTHROPIC_API_KEY"))
+        return _anthropic_client
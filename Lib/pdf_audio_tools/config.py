@@ -0,0 +1,80 @@
+import os
+import json
+import threading
+
+# Repository root: configs and the .ai-news-status directory live here
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+def resolve_config_path(config_path=None):
+    if config_path is None:
+        return os.path.join(BASE_DIR, 'ai-news-config.json')
+    if not os.path.isabs(config_path):
+        # Convert relative path to absolute
+        return os.path.join(BASE_DIR, config_path)
+    return config_path
+
+def load_config(config_path=None):
+    """
+    Load configuration from file.
+    Args:
+        config_path: Path to the config file. If None, uses default ai-news-config.json
+    Returns:
+        dict: Configuration dictionary with default values if loading fails
+    """
+    config_path = resolve_config_path(config_path)
+    
+    # Try to load the specified config file
+    try:
+        with open(config_path, 'r', encoding='utf-8') as f:
+            config = json.load(f)
+            # Ensure default values exist
+            if 'categories' not in config:
+                config['categories'] = {}
+            if 'news_sources' not in config:
+                config['news_sources'] = []
+            if 'output_prefix' not in config:
+                config['output_prefix'] = 'tech_news'
+            return config
+    except Exception as e:
+        print(f"[ERROR] Failed to load configuration from {config_path}: {str(e)}")
+        print("[INFO] Using example config as fallback")
+        
+        # Try to load example config as fallback
+        example_path = os.path.join(BASE_DIR, 'ai-news-config.example.json')
+        try:
+            with open(example_path, 'r', encoding='utf-8') as f:
+                config = json.load(f)
+                config['output_prefix'] = 'tech_news'  # Add default prefix
+                return config
+        except Exception as e2:
+            print(f"[ERROR] Failed to load example config: {str(e2)}")
+            
+        # Return empty config with defaults if all else fails
+        return {
+            "categories": {},
+            "news_sources": [],
+            "output_prefix": "tech_news"
+        }
+
+# path -> (mtime, config), shared by every caller in the process
+_config_cache = {}
+_config_lock = threading.Lock()
+
+def get_config(config_path=None):
+    """
+    Return the configuration for config_path, loading the file only once.
+    The cached copy is reloaded when the file's modification time changes.
+    Callers must treat the returned dict as read-only.
+    """
+    config_path = resolve_config_path(config_path)
+    try:
+        mtime = os.path.getmtime(config_path)
+    except OSError:
+        mtime = None
+    with _config_lock:
+        cached = _config_cache.get(config_path)
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+        config = load_config(config_path)
+        _config_cache[config_path] = (mtime, config)
+        return config
@@ -0,0 +1,68 @@
+import requests
+from Lib.http_session import get_fetch_client
+
+# Returned as the error of get_website_content_conditional when the server answers 304
+NOT_MODIFIED = "HTTP 304 Not Modified"
+
+def get_website_content(url):
+    html_content, error, _ = get_website_content_conditional(url)
+    return html_content, error
+
+def get_validators(response):
+    """Extract the cache validators (ETag / Last-Modified) from a response."""
+    validators = {}
+    etag = response.headers.get('ETag')
+    if etag:
+        validators['etag'] = etag
+    last_modified = response.headers.get('Last-Modified')
+    if last_modified:
+        validators['last_modified'] = last_modified
+    return validators
+
+def get_conditional_headers(previous_state):
+    """Build If-None-Match / If-Modified-Since headers from a stored state."""
+    headers = {}
+    # Only revalidate when we still have the content the validators belong to
+    if not previous_state or not previous_state.get("content"):
+        return headers
+    if previous_state.get("etag"):
+        headers['If-None-Match'] = previous_state["etag"]
+    if previous_state.get("last_modified"):
+        headers['If-Modified-Since'] = previous_state["last_modified"]
+    return headers
+
+def get_website_content_conditional(url, previous_state=None):
+    """
+    Fetch a page, revalidating it against the validators stored in previous_state.
+    Returns:
+        tuple: (html, error, validators). On HTTP 304 html is None and error is NOT_MODIFIED.
+    """
+    print(f"[DEBUG] Attempting to fetch content from {url}")
+    headers = {
+        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:123.0) Gecko/20100101 Firefox/123.0',
+        'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
+        'Accept-Language': 'en-US,en;q=0.5',
+        'DNT': '1',
+        'Connection': 'keep-alive',
+        'Upgrade-Insecure-Requests': '1',
+        'Sec-Fetch-Dest': 'document',
+        'Sec-Fetch-Mode': 'navigate',
+        'Sec-Fetch-Site': 'none',
+        'Sec-Fetch-User': '?1'
+    }
+    headers.update(get_conditional_headers(previous_state))
+    try:
+        response = get_fetch_client().get(url, headers=headers, timeout=30)
+        if response.status_code == 304:
+            print(f"[DEBUG] {url} not modified since last run")
+            return None, NOT_MODIFIED, get_validators(response)
+        if response.status_code != 200:
+            error_msg = f"HTTP {response.status_code}"
+            print(f"[DEBUG] Error fetching the website {url}: {error_msg}")
+            return None, error_msg, {}
+        print(f"[DEBUG] Successfully fetched content from {url}")
+        return response.text, None, get_validators(response)
+    except requests.RequestException as e:
+        error_msg = str(e)
+        print(f"[DEBUG] Error fetching the website {url}: {error_msg}")
+        return None, error_msg, {}
@@ -0,0 +1,322 @@
+import re
+from html.parser import HTMLParser
+from urllib.parse import urljoin
+from bs4.dammit import EntitySubstitution, UnicodeDammit
+
+# The text extraction mirrors BeautifulSoup(html, 'html.parser').get_text() after
+# decomposing script/style, so every backend produces the same lines and the
+# state stored by get_content_diff stays valid when switching backends.
+
+# Whitespace BeautifulSoup collapses in whitespace-only strings
+_ASCII_SPACES = {ord(c): None for c in '\x20\x0a\x09\x0c\x0d'}
+# Strings inside these are Script/Stylesheet/TemplateString/RubyText strings and left out of get_text()
+_STRING_CONTAINERS = frozenset(['script', 'style', 'template', 'rt', 'rp'])
+_PRESERVE_WHITESPACE = frozenset(['pre', 'textarea'])
+_VOID_ELEMENTS = frozenset([
+    'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input', 'keygen', 'link', 'menuitem',
+    'meta', 'param', 'source', 'track', 'wbr', 'basefont', 'bgsound', 'command', 'frame',
+    'image', 'isindex', 'nextid', 'spacer'
+])
+
+_DECIMAL_REFERENCE = re.compile("^([0-9]+)(.*)")
+_HEX_REFERENCE = re.compile("^([0-9a-f]+)(.*)")
+
+DEFAULT_BACKEND = 'stream'
+_backend = DEFAULT_BACKEND
+
+
+def _numeric_character_reference(codepoint):
+    # Resolve &#...; exactly like the installed BeautifulSoup does
+    if hasattr(UnicodeDammit, 'numeric_character_reference'):
+        return UnicodeDammit.numeric_character_reference(codepoint)[0]
+    data = None
+    if codepoint < 256:
+        # Older BeautifulSoup: numeric references below 256 are often meant as Windows-1252
+        try:
+            data = bytearray([codepoint]).decode('windows-1252')
+        except UnicodeDecodeError:
+            pass
+    if not data:
+        try:
+            data = chr(codepoint)
+        except (ValueError, OverflowError):
+            pass
+    return data or "\N{REPLACEMENT CHARACTER}"
+
+
+class _TextCollector:
+    """Tracks the open tags and turns character data into the strings get_text() would return."""
+
+    def __init__(self):
+        self.strings = []
+        self.hrefs = []
+        self._data = []
+        self._stack = []
+        self._containers = 0
+        self._preserving = 0
+
+    def flush(self, is_cdata=False):
+        if not self._data:
+            return
+        data = ''.join(self._data)
+        self._data = []
+        if not self._preserving and data.translate(_ASCII_SPACES) == '':
+            data = '\n' if '\n' in data else ' '
+        if is_cdata or not self._containers:
+            self.strings.append(data)
+
+    def data(self, data):
+        self._data.append(data)
+
+    def push(self, name):
+        self.flush()
+        self._stack.append(name)
+        if name in _STRING_CONTAINERS:
+            self._containers += 1
+        if name in _PRESERVE_WHITESPACE:
+            self._preserving += 1
+
+    def pop_to(self, name):
+        self.flush()
+        if name not in self._stack:
+            return
+        while self._stack:
+            popped = self._stack.pop()
+            if popped in _STRING_CONTAINERS:
+                self._containers -= 1
+            if popped in _PRESERVE_WHITESPACE:
+                self._preserving -= 1
+            if popped == name:
+                break
+
+    def cdata(self, data):
+        self.flush()
+        self._data.append(data)
+        self.flush(is_cdata=True)
+
+    def text(self):
+        self.flush()
+        return ''.join(self.strings)
+
+
+class _StreamingExtractor(HTMLParser):
+    """
+    Tag-skipping tokenizer on top of the same stdlib parser BeautifulSoup's
+    html.parser builder uses, without building a tree.
+    """
+
+    def __init__(self):
+        super().__init__(convert_charrefs=False)
+        self.collector = _TextCollector()
+        self._closed_void_elements = []
+
+    def handle_starttag(self, tag, attrs, handle_empty_element=True):
+        self.collector.push(tag)
+        if tag == 'a':
+            hrefs = [value for key, value in attrs if key == 'href']
+            if hrefs:
+                # Last duplicate wins and a bare href counts as empty, as in BeautifulSoup
+                self.collector.hrefs.append(hrefs[-1] or '')
+        if tag in _VOID_ELEMENTS and handle_empty_element:
+            self.handle_endtag(tag, check_already_closed=False)
+            self._closed_void_elements.append(tag)
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs, handle_empty_element=False)
+        self.handle_endtag(tag, check_already_closed=False)
+
+    def handle_endtag(self, tag, check_already_closed=True):
+        if check_already_closed and tag in self._closed_void_elements:
+            # Redundant end tag of a void element that was already closed
+            self._closed_void_elements.remove(tag)
+        else:
+            self.collector.pop_to(tag)
+
+    def handle_data(self, data):
+        self.collector.data(data)
+
+    def handle_charref(self, name):
+        base, pattern = 10, _DECIMAL_REFERENCE
+        if name.startswith(('x', 'X')):
+            name, base, pattern = name[1:], 16, _HEX_REFERENCE
+        extra_data = ''
+        try:
+            codepoint = int(name, base)
+        except ValueError:
+            # A reference without its semicolon: the digits are the reference, the rest is text
+            match = pattern.search(name)
+            if match is None:
+                self.collector.data(name)
+                return
+            codepoint, extra_data = int(match.group(1), base), match.group(2)
+        self.collector.data(_numeric_character_reference(codepoint))
+        if extra_data:
+            self.collector.data(extra_data)
+
+    def handle_entityref(self, name):
+        character = EntitySubstitution.HTML_ENTITY_TO_CHARACTER.get(name)
+        self.collector.data(character if character is not None else "&%s" % name)
+
+    def handle_comment(self, data):
+        self.collector.flush()
+
+    def handle_decl(self, data):
+        self.collector.flush()
+
+    def handle_pi(self, data):
+        self.collector.flush()
+
+    def unknown_decl(self, data):
+        if data.upper().startswith('CDATA['):
+            self.collector.cdata(data[len('CDATA['):])
+        else:
+            self.collector.flush()
+
+
+def _extract_stream(html_content):
+    parser = _StreamingExtractor()
+    parser.feed(html_content)
+    parser.close()
+    return parser.collector.text(), parser.collector.hrefs
+
+
+def _extract_bs4(html_content):
+    from bs4 import BeautifulSoup
+    soup = BeautifulSoup(html_content, 'html.parser')
+    hrefs = [a.get('href') for a in soup.find_all('a', href=True)]
+
+    # Remove script and style elements
+    for script in soup(["script", "style"]):
+        script.decompose()
+
+    return soup.get_text(), hrefs
+
+
+class _LxmlTarget:
+    """Parser target receiving libxml2's parse events without building a tree."""
+
+    def __init__(self):
+        self.collector = _TextCollector()
+
+    def start(self, tag, attrib):
+        tag = tag.lower()
+        self.collector.push(tag)
+        if tag == 'a' and 'href' in attrib:
+            self.collector.hrefs.append(attrib['href'])
+
+    def end(self, tag):
+        self.collector.pop_to(tag.lower())
+
+    def data(self, data):
+        self.collector.data(data)
+
+    def comment(self, text):
+        self.collector.flush()
+
+    def pi(self, target, data=None):
+        self.collector.flush()
+
+    def close(self):
+        return self.collector.text(), self.collector.hrefs
+
+
+def _extract_lxml(html_content):
+    from lxml import etree
+    parser = etree.HTMLParser(target=_LxmlTarget())
+    parser.feed(html_content)
+    return parser.close()
+
+
+def _extract_selectolax(html_content):
+    from selectolax.lexbor import LexborHTMLParser
+    tree = LexborHTMLParser(html_content)
+    if tree.root is None:
+        return '', []
+    hrefs = [node.attributes.get('href') or '' for node in tree.css('a[href]')]
+    tree.strip_tags(sorted(_STRING_CONTAINERS))
+    strings = []
+    for node in tree.root.traverse(include_text=True):
+        if node.tag != '-text':
+            continue
+        data = node.text_content
+        if data.translate(_ASCII_SPACES) == '' and not _inside_preserving_tag(node):
+            data = '\n' if '\n' in data else ' '
+        strings.append(data)
+    return ''.join(strings), hrefs
+
+
+def _inside_preserving_tag(node):
+    parent = node.parent
+    while parent is not None:
+        if parent.tag in _PRESERVE_WHITESPACE:
+            return True
+        parent = parent.parent
+    return False
+
+
+# Each extractor returns (text before line normalisation, hrefs of all <a href> tags)
+EXTRACTORS = {
+    'stream': _extract_stream,
+    'bs4': _extract_bs4,
+    'lxml': _extract_lxml,
+    'selectolax': _extract_selectolax,
+}
+
+
+def set_html_backend(name):
+    """Select the extractor clean_html uses by default: stream, bs4, lxml or selectolax."""
+    global _backend
+    if name not in EXTRACTORS:
+        raise ValueError(f"Unknown HTML backend: {name} (choose from {', '.join(EXTRACTORS)})")
+    _backend = name
+
+
+def normalize_text(text):
+    # Break into lines and remove leading and trailing space on each
+    lines = (line.strip() for line in text.splitlines())
+    # Break multi-headlines into a line each
+    chunks = (phrase.strip() for line in lines for phrase in line.split("  "))
+    # Drop blank lines and join with newline characters
+    return '\n'.join(chunk for chunk in chunks if chunk)
+
+
+def extract_text(html_content, backend=None):
+    """clean_html without the logging, for callers that process many pages."""
+    return normalize_text(EXTRACTORS[backend or _backend](html_content)[0])
+
+
+class ParsedPage:
+    """
+    Cleaned text and link targets of one page, taken from a single parse.
+    text is identical to clean_html(html) and hrefs lists the href of every
+    <a href> in document order.
+    """
+
+    def __init__(self, url, raw_text, hrefs):
+        self.url = url
+        self.hrefs = hrefs
+        self._raw_text = raw_text
+        self._text = None
+
+    @property
+    def text(self):
+        if self._text is None:
+            self._text = normalize_text(self._raw_text)
+            self._raw_text = None
+        return self._text
+
+    def links(self):
+        """Absolute URLs of all links on the page."""
+        return {urljoin(self.url, href) for href in self.hrefs}
+
+
+def parse_page(html_content, url, backend=None):
+    raw_text, hrefs = EXTRACTORS[backend or _backend](html_content)
+    return ParsedPage(url, raw_text, hrefs)
+
+
+def clean_html(html_content, backend=None):
+    print("[DEBUG] Cleaning HTML content")
+    text = extract_text(html_content, backend)
+    print("[DEBUG] HTML content cleaned")
+    return text
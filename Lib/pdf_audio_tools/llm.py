@@ -0,0 +1,257 @@
+import os
+from Lib.llm_cache import get_llm_cache, make_cache_key, DEFAULT_TTL_HOURS, DEFAULT_MAX_ENTRIES
+from Lib.prompt_budget import (
+    count_tokens, pack_lines, take_batches, DEFAULT_MAX_CONTENT_TOKENS, DEFAULT_BATCH_TOKENS, DEFAULT_MAX_BATCHES
+)
+from Lib.pdf_audio_tools.config import get_config
+from Lib.pdf_audio_tools.state import get_state_directory
+
+def get_response_cache(config):
+    """Return the LLM response cache configured under 'llm_cache', or None if it is disabled."""
+    cache_config = config.get('llm_cache', {})
+    if not cache_config.get('enabled', True):
+        return None
+    path = cache_config.get('path') or os.path.join(get_state_directory(), 'llm_cache.sqlite')
+    return get_llm_cache(
+        path,
+        ttl_hours=cache_config.get('ttl_hours', DEFAULT_TTL_HOURS),
+        max_entries=cache_config.get('max_entries', DEFAULT_MAX_ENTRIES)
+    )
+
+def get_model_settings(config, model=None):
+    """Return (provider, model) from the config's model_config, with an optional model override."""
+    model_config = config.get('model_config', {'provider': 'openai', 'model': 'gpt-4'})
+    provider = model_config.get('provider', 'openai')
+    return provider, model or model_config.get('model', 'gpt-4')
+
+def call_gpt(system_message, user_message, model=None, config=None, use_cache=True):
+    """
+    Send one chat completion from synchronous code and wait for the answer.
+    Runs call_gpt_async on the process-wide LLM event loop, so calls from all
+    threads share one in-flight limit, the per-provider rate limits and retries.
+    Returns None on failure.
+    """
+    from Lib.llm_async import run_llm_coroutine
+    return run_llm_coroutine(call_gpt_async(system_message, user_message, model, config, use_cache))
+
+async def call_gpt_async(system_message, user_message, model=None, config=None, use_cache=True):
+    """
+    Async variant of call_gpt. Requests share one client per event loop, which
+    limits requests in flight, rate limits each provider and retries 429/5xx.
+    Returns None on failure, like call_gpt.
+    """
+    if config is None:
+        config = get_config()
+    provider, model = get_model_settings(config, model)
+
+    cache = get_response_cache(config) if use_cache else None
+    if cache is not None:
+        cache_key = make_cache_key(provider, model, system_message, user_message)
+        answer = cache.get(cache_key)
+        if answer is not None:
+            print(f"[DEBUG] Using cached {provider} response for model {model}")
+            return answer
+
+    print(f"[DEBUG] Calling {provider} API with model {model} (async)")
+    from Lib.llm_async import get_async_llm_client
+    client = get_async_llm_client(config.get('llm_async'))
+    try:
+        answer = await client.complete(provider, model, system_message, user_message)
+    except Exception as e:
+        print(f"[ERROR] Error calling {provider} API: {str(e)}")
+        return None
+
+    if cache is not None and answer:
+        cache.put(cache_key, answer)
+    return answer
+
+def call_gpt_many(prompts, model=None, config=None, use_cache=True):
+    """
+    Run several (system_message, user_message) prompts concurrently from synchronous code.
+    All calls, from any thread, share one event loop and so one rate limit per provider.
+    Returns:
+        list: Answers in prompt order, None for prompts that failed
+    """
+    import asyncio
+    from Lib.llm_async import run_llm_coroutine
+
+    async def run_all():
+        return await asyncio.gather(*(
+            call_gpt_async(system_message, user_message, model, config, use_cache)
+            for system_message, user_message in prompts
+        ))
+    return run_llm_coroutine(run_all())
+
+def call_gpt_batch(prompts, model=None, config=None, use_cache=True):
+    """
+    Run (system_message, user_message) prompts through the provider's batch API,
+    at batch prices and outside the interactive rate limits, and wait for them.
+    Cached answers are reused and only the rest is submitted.
+    Returns:
+        list: Answers in prompt order, None for prompts that failed
+    """
+    if config is None:
+        config = get_config()
+    provider, model = get_model_settings(config, model)
+
+    cache = get_response_cache(config) if use_cache else None
+    answers = [None] * len(prompts)
+    missing = []
+    for index, (system_message, user_message) in enumerate(prompts):
+        if cache is not None:
+            answers[index] = cache.get(make_cache_key(provider, model, system_message, user_message))
+        if answers[index] is None:
+            missing.append(index)
+    print(f"[DEBUG] {len(prompts) - len(missing)} of {len(prompts)} batch prompts answered from cache")
+    if not missing:
+        return answers
+
+    from Lib.llm_batch import run_batch, DEFAULT_POLL_INTERVAL, DEFAULT_BATCH_TIMEOUT_HOURS
+    batch_config = config.get('llm_batch', {})
+    try:
+        batch_answers = run_batch(
+            provider, model, [prompts[index] for index in missing],
+            poll_interval=batch_config.get('poll_interval', DEFAULT_POLL_INTERVAL),
+            timeout_hours=batch_config.get('timeout_hours', DEFAULT_BATCH_TIMEOUT_HOURS)
+        )
+    except Exception as e:
+        print(f"[ERROR] Error running {provider} batch: {str(e)}")
+        return answers
+
+    for index, answer in zip(missing, batch_answers):
+        answers[index] = answer
+        if cache is not None and answer:
+            system_message, user_message = prompts[index]
+            cache.put(make_cache_key(provider, model, system_message, user_message), answer)
+    return answers
+
+def build_analysis_prompt(content, url, keywords, category, config):
+    """
+    Returns:
+        tuple: (system_message, user_message) asking for a German summary of content
+    """
+    keywords_str = ", ".join(keywords)
+    
+    # Get system message from config
+    categories = config.get('categories', {})
+    category_config = categories.get(category, {})
+    system_message = category_config.get('system_message', "You are an expert technology analyst.")
+    
+    user_message = """Please analyze the following new content from {0} and provide a summary of the latest developments related to {1}, 
+    focusing on these keywords: {2}. Highlight the most important updates and their practical implications for developers.
+    Provide the summary in German.
+    
+    Content to analyze:
+    {3}
+    """.format(url, category, keywords_str, content)
+    return system_message, user_message
+
+def build_batch_summary_prompt(content, url, keywords, category, config, part, parts):
+    """Map step for large content: condense one batch of lines before the final analysis."""
+    system_message, _ = build_analysis_prompt("", url, keywords, category, config)
+    user_message = """The new content from {0} is too long for one request and was split into {1} parts. This is part {2}.
+    List every development related to {3} and these keywords: {4}, with its concrete facts (names, versions, dates, numbers).
+    Leave out navigation, advertising and anything unrelated. Answer in German.
+    
+    Content part {2} of {1}:
+    {5}
+    """.format(url, parts, part, category, ", ".join(keywords), content)
+    return system_message, user_message
+
+def limit_analysis_content(content, url, config):
+    """
+    Split off the content beyond the prompt budget's max_batches, so it can be
+    kept for the next run instead of being dropped unanalysed.
+    Returns:
+        tuple: (content to analyse, leftover content or "")
+    """
+    _, model = get_model_settings(config)
+    budget = config.get('prompt_budget', {})
+    if count_tokens(content, model) <= budget.get('max_content_tokens', DEFAULT_MAX_CONTENT_TOKENS):
+        return content, ""
+    max_batches = budget.get('max_batches', DEFAULT_MAX_BATCHES)
+    first_line = content.split('\n', 1)[0]
+    content, leftover = take_batches(content, budget.get('batch_tokens', DEFAULT_BATCH_TOKENS), max_batches, model)
+    if len(content) < len(first_line):
+        print(f"[WARNING] A single line from {url} exceeds {max_batches} batches, only its beginning is analysed")
+    if leftover:
+        print(f"[WARNING] Content from {url} needs more than {max_batches} batches, the rest is left for the next run")
+    return content, leftover
+
+def build_batch_summary_prompts(content, url, keywords, category, config):
+    """
+    Split content that exceeds the prompt budget into batch summary prompts.
+    Returns:
+        list: Map prompts, or None if content fits into a single analysis prompt
+    """
+    _, model = get_model_settings(config)
+    budget = config.get('prompt_budget', {})
+    max_content_tokens = budget.get('max_content_tokens', DEFAULT_MAX_CONTENT_TOKENS)
+    if count_tokens(content, model) <= max_content_tokens:
+        return None
+    batches = pack_lines(content, budget.get('batch_tokens', DEFAULT_BATCH_TOKENS), model)
+    max_batches = budget.get('max_batches', DEFAULT_MAX_BATCHES)
+    if len(batches) > max_batches:
+        # Callers that keep the rest for later pass content through limit_analysis_content first
+        print(f"[WARNING] Content from {url} needs {len(batches)} batches, only the first {max_batches} are analysed")
+        batches = batches[:max_batches]
+    print(f"[DEBUG] Summarising {len(batches)} batches for {url}")
+    return [
+        build_batch_summary_prompt(batch, url, keywords, category, config, part, len(batches))
+        for part, batch in enumerate(batches, 1)
+    ]
+
+def get_gpt4_analysis(content, url, keywords, category, config=None):
+    print(f"[DEBUG] Starting GPT-4 analysis for {url} in category {category}")
+    if config is None:
+        config = get_config()
+    
+    map_prompts = build_batch_summary_prompts(content, url, keywords, category, config)
+    if map_prompts is not None:
+        # Too large for one prompt: summarise budget-sized batches in parallel, then analyse the summaries
+        summaries = [summary for summary in call_gpt_many(map_prompts, config=config) if summary]
+        if not summaries:
+            return None
+        content = "\n\n".join(summaries)
+    
+    system_message, user_message = build_analysis_prompt(content, url, keywords, category, config)
+    return call_gpt(system_message, user_message, config=config)
+
+def get_gpt4_analysis_batch(jobs, config=None):
+    """
+    get_gpt4_analysis for many pages at once through the provider's batch API.
+    jobs: list of (content, url, keywords, category)
+    Returns:
+        list: Analyses in job order, None where the analysis failed
+    """
+    if config is None:
+        config = get_config()
+    
+    # Round 1: the analysis prompts, plus the summary prompts of oversized contents
+    prompts = []
+    plans = []  # (index of the job's first prompt, number of summary prompts or None)
+    for content, url, keywords, category in jobs:
+        map_prompts = build_batch_summary_prompts(content, url, keywords, category, config)
+        if map_prompts is None:
+            plans.append((len(prompts), None))
+            prompts.append(build_analysis_prompt(content, url, keywords, category, config))
+        else:
+            plans.append((len(prompts), len(map_prompts)))
+            prompts.extend(map_prompts)
+    answers = call_gpt_batch(prompts, config=config)
+    
+    # Round 2: analyse the summaries of the oversized contents
+    analyses = [None] * len(jobs)
+    reduce_jobs, reduce_prompts = [], []
+    for job_index, ((first, count), (_, url, keywords, category)) in enumerate(zip(plans, jobs)):
+        if count is None:
+            analyses[job_index] = answers[first]
+            continue
+        summaries = [summary for summary in answers[first:first + count] if summary]
+        if summaries:
+            reduce_jobs.append(job_index)
+            reduce_prompts.append(build_analysis_prompt("\n\n".join(summaries), url, keywords, category, config))
+    if reduce_prompts:
+        for job_index, analysis in zip(reduce_jobs, call_gpt_batch(reduce_prompts, config=config)):
+            analyses[job_index] = analysis
+    return analyses
@@ -0,0 +1,32 @@
+import os
+import sys
+import random
+from PyPDF2 import PdfReader
+
+def get_random_pdf(directory):
+    pdf_files = [f for f in os.listdir(directory) if f.lower().endswith('.pdf')]
+    if not pdf_files:
+        raise ValueError(f"No PDF files found in {directory}")
+    return os.path.join(directory, random.choice(pdf_files))
+
+def extract_text_from_pdf(pdf_path, start_page, num_pages):
+    print(f"[DEBUG] Extracting text from PDF, starting at page {start_page}")
+    text = ""
+    try:
+        with open(pdf_path, 'rb') as file:
+            pdf_reader = PdfReader(file)
+            total_pages = len(pdf_reader.pages)
+            end_page = min(start_page + num_pages, total_pages)
+            for page_num in range(start_page, end_page):
+                page_text = pdf_reader.pages[page_num].extract_text()
+                text += page_text + "\n\n"
+                
+                # Save each page's text to a separate file for debugging
+                debug_filename = f"page_{page_num + 1}_debug.txt"
+                with open(debug_filename, 'w', encoding='utf-8') as debug_file:
+                    debug_file.write(page_text)
+                print(f"[DEBUG] Saved text from page {page_num + 1} to {debug_filename}")
+    except Exception as e:
+        print(f"[ERROR] An error occurred while reading the PDF: {str(e)}")
+        sys.exit(1)
+    return text
@@ -0,0 +1,168 @@
+import os
+import sys
+import json
+import zlib
+import base64
+import hashlib
+import time
+from array import array
+from Lib.pdf_audio_tools.config import BASE_DIR
+
+# 'sqlite' keeps all states in .ai-news-status/state.db, 'json' writes one state_<md5>.json per URL
+STATE_BACKENDS = ('sqlite', 'json')
+DEFAULT_STATE_BACKEND = 'sqlite'
+_state_backend = DEFAULT_STATE_BACKEND
+
+def hash_content(content):
+    return hashlib.md5(content.encode()).hexdigest()
+
+def get_state_directory():
+    status_dir = os.path.join(BASE_DIR, '.ai-news-status')
+    os.makedirs(status_dir, exist_ok=True)
+    return status_dir
+
+def get_state_filename(url):
+    return os.path.join(get_state_directory(), f"state_{hash_content(url)}.json")
+
+def _line_hash(line):
+    return int.from_bytes(hashlib.blake2b(line.encode('utf-8'), digest_size=8).digest(), 'little')
+
+class LineHashSet:
+    """
+    The lines of a stored page, kept only as 64-bit blake2b hashes.
+    Supports `line in hashes` and is truthy exactly when the page content was,
+    so get_content_diff treats it like the content string it replaces.
+    Stored as a zlib-compressed, sorted array of the hashes.
+    """
+
+    def __init__(self, encoded, has_content):
+        self._encoded = encoded
+        self._hashes = None
+        self._has_content = has_content
+
+    @classmethod
+    def from_content(cls, content):
+        hash_set = cls(None, bool(content))
+        hash_set._hashes = frozenset(_line_hash(line) for line in content.split('\n'))
+        return hash_set
+
+    def _get_hashes(self):
+        # Decoded on first membership test; a revalidation that ends in a 304 never needs them
+        if self._hashes is None:
+            hashes = array('Q')
+            hashes.frombytes(zlib.decompress(base64.b64decode(self._encoded)))
+            if sys.byteorder == 'big':
+                hashes.byteswap()
+            self._hashes = frozenset(hashes)
+        return self._hashes
+
+    def encode(self):
+        if self._encoded is None:
+            hashes = array('Q', sorted(self._hashes))
+            if sys.byteorder == 'big':
+                hashes.byteswap()
+            self._encoded = base64.b64encode(zlib.compress(hashes.tobytes(), 9)).decode('ascii')
+        return self._encoded
+
+    def __contains__(self, line):
+        return _line_hash(line) in self._get_hashes()
+
+    def __bool__(self):
+        return self._has_content
+
+    def __len__(self):
+        return len(self._get_hashes())
+
+def _decode_state(state):
+    # Pre line-hash states still carry the full text in "content" and are used as they are
+    if "line_hashes" in state:
+        state["content"] = LineHashSet(state.pop("line_hashes"), state.pop("has_content", True))
+    return state
+
+def get_state_database_path():
+    return os.path.join(get_state_directory(), 'state.db')
+
+def set_state_backend(name):
+    """Select where page states are kept: sqlite (default) or json."""
+    global _state_backend
+    if name not in STATE_BACKENDS:
+        raise ValueError(f"Unknown state backend: {name} (choose from {', '.join(STATE_BACKENDS)})")
+    _state_backend = name
+
+def _get_store():
+    from Lib.state_store import get_state_store
+    # Existing state_<md5>.json files are picked up on first access
+    return get_state_store(get_state_database_path(), get_state_directory())
+
+def load_previous_content(url):
+    if _state_backend == 'sqlite':
+        state = _get_store().load(hash_content(url))
+        if state is None:
+            return {"content": "", "last_processed": None}
+        # The store hands out its cached dict, decode a copy
+        return _decode_state(dict(state))
+    filename = get_state_filename(url)
+    try:
+        with open(filename, 'r') as f:
+            return _decode_state(json.load(f))
+    except FileNotFoundError:
+        return {"content": "", "last_processed": None}
+
+def save_current_content(url, content, validators=None, unprocessed=None):
+    """
+    unprocessed: new lines that were not analysed; they are left out of the
+    state, so the next run's diff offers them again
+    """
+    has_content = bool(content)
+    if unprocessed:
+        skipped = set(unprocessed.split('\n'))
+        content = '\n'.join(line for line in content.split('\n') if line.strip() not in skipped)
+        # A 304 on the next fetch would hide the skipped lines
+        validators = None
+    # Only the line hashes are kept, that is all get_content_diff needs on the next run
+    state = {
+        "line_hashes": LineHashSet.from_content(content).encode(),
+        "has_content": has_content,
+        "last_processed": time.time()
+    }
+    # ETag / Last-Modified of the response the content was cleaned from
+    if validators:
+        state.update(validators)
+    if _state_backend == 'sqlite':
+        _get_store().save(hash_content(url), state)
+        return
+    filename = get_state_filename(url)
+    with open(filename, 'w', newline='\n') as f:
+        json.dump(state, f, indent=2)
+
+def get_content_diff(previous_content, current_content):
+    """
+    Identifies new content by comparing current with previous content.
+    Optimized for finding new/modified content only, ignoring deletions.
+    Uses sets for efficient comparison and handles similar content as new.
+    """
+    if not previous_content:
+        return current_content
+    
+    if isinstance(previous_content, LineHashSet):
+        # Stored state: membership is tested on the line hashes
+        previous_lines = previous_content
+    else:
+        # Split into lines and create a set for efficient lookup
+        previous_lines = set(previous_content.split('\n'))
+    current_lines = current_content.split('\n')
+    
+    # Keep track of new content while maintaining order
+    new_content = []
+    
+    # Process each current line
+    for line in current_lines:
+        line = line.strip()
+        # Skip empty lines
+        if not line:
+            continue
+        # If line is not in previous content, it's new
+        if line not in previous_lines:
+            new_content.append(line)
+    
+    return '\n'.join(new_content) if new_content else ""
@@ -0,0 +1,77 @@
+import random
+from concurrent.futures import ThreadPoolExecutor
+from Lib.pdf_audio_tools.clients import get_openai_client
+from Lib.text_split import join_pieces
+
+MAX_CHARS = 4096  # OpenAI's TTS API limit
+TTS_WORKERS = 4
+
+
+def split_for_speech(text, max_chars=MAX_CHARS):
+    """Split text at word boundaries into chunks of at most max_chars characters."""
+    return join_pieces(text.split(), max_chars, trailing_separator=False)
+
+
+def _synthesize_chunk(i, count, chunk):
+    try:
+        print(f"[DEBUG] Converting chunk {i+1} of {count}")
+        response = get_openai_client().audio.speech.create(
+            model="tts-1",
+            voice="alloy",
+            input=chunk
+        )
+        print(f"[DEBUG] Successfully converted chunk {i+1}")
+        return response.content
+    except Exception as e:
+        print(f"[DEBUG] Error during text-to-speech conversion for chunk {i+1}: {e}")
+        return None
+
+
+def iter_speech(text, max_workers=TTS_WORKERS):
+    """
+    Synthesise text with up to max_workers chunks in flight and yield each
+    chunk's audio in text order as soon as it and all chunks before it are done,
+    so playback can start while the rest is still being converted.
+    Chunks that fail are left out, as in text_to_speech.
+    """
+    print("[DEBUG] Converting text to speech")
+    chunks = split_for_speech(text)
+    if not chunks:
+        return
+    executor = ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(chunks))))
+    try:
+        futures = [executor.submit(_synthesize_chunk, i, len(chunks), chunk) for i, chunk in enumerate(chunks)]
+        for future in futures:
+            audio = future.result()
+            if audio is not None:
+                yield audio
+    finally:
+        # A consumer that stops early doesn't wait for the remaining chunks
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def text_to_speech(text, max_workers=TTS_WORKERS):
+    """
+    Returns:
+        list: MP3 audio of each chunk of text, in order
+    """
+    return list(iter_speech(text, max_workers))
+
+
+def chunk_to_speech(text):
+    print("[DEBUG] Converting text to speech")
+    try:
+        voices = ["alloy", "echo", "fable", "onyx", "nova", "shimmer"]
+        random_voice = random.choice(voices)
+        print(f"[DEBUG] Selected voice: {random_voice}")
+        response = get_openai_client().audio.speech.create(
+            model="tts-1",
+            voice=random_voice,
+            input=text
+        )
+        return response.content
+    
+    except Exception as e:
+        print(f"[DEBUG] Error during text-to-speech conversion: {e}")
+    
+    return None
@@ -0,0 +1,57 @@
+import queue
+import threading
+
+
+class Prefetcher:
+    """
+    Calls produce() over and over on a background thread and keeps up to depth
+    results ready, so the next item is prepared while the current one is used.
+    At most depth finished results plus the one being produced are held in
+    memory; the thread waits while the queue is full.
+    An exception raised by produce() is handed to the consumer by get(), and
+    production goes on with the next item.
+    """
+
+    def __init__(self, produce, depth=1, name="prefetch"):
+        self._produce = produce
+        self._queue = queue.Queue(maxsize=max(1, depth))
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                item = (self._produce(), None)
+            except (Exception, SystemExit) as e:
+                item = (None, e)
+            while not self._stop.is_set():
+                try:
+                    self._queue.put(item, timeout=0.5)
+                    break
+                except queue.Full:
+                    continue
+
+    def get(self):
+        """Wait for the next result, in the order they were produced; re-raises produce()'s exception."""
+        result, error = self._queue.get()
+        if error is not None:
+            raise error
+        return result
+
+    def close(self, timeout=None):
+        """Stop producing. An item in progress is finished and thrown away."""
+        self._stop.set()
+        while True:
+            try:
+                self._queue.get_nowait()
+            except queue.Empty:
+                break
+        self._thread.join(timeout)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        # Don't wait for a long produce() call when the user stops the program
+        self.close(timeout=0 if exc_type is KeyboardInterrupt else None)
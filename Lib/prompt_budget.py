@@ -0,0 +1,92 @@
+import functools
+
+DEFAULT_MAX_CONTENT_TOKENS = 6000
+DEFAULT_BATCH_TOKENS = 4000
+DEFAULT_MAX_BATCHES = 8
+# Rough size of a token in characters, used when tiktoken isn't installed
+CHARS_PER_TOKEN = 4
+
+
+@functools.lru_cache(maxsize=None)
+def _get_encoding(model):
+    try:
+        import tiktoken
+    except ImportError:
+        return None
+    try:
+        return tiktoken.encoding_for_model(model)
+    except (KeyError, TypeError):
+        # Non-OpenAI models: cl100k_base is a close enough estimate for budgeting
+        return tiktoken.get_encoding('cl100k_base')
+
+
+def count_tokens(text, model=None):
+    """Number of tokens in text for model, estimated from the length without tiktoken."""
+    encoding = _get_encoding(model)
+    if encoding is None:
+        return -(-len(text) // CHARS_PER_TOKEN)
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def _split_long_line(line, max_tokens, model):
+    encoding = _get_encoding(model)
+    if encoding is None:
+        size = max_tokens * CHARS_PER_TOKEN
+        return [line[i:i + size] for i in range(0, len(line), size)]
+    tokens = encoding.encode(line, disallowed_special=())
+    return [encoding.decode(tokens[i:i + max_tokens]) for i in range(0, len(tokens), max_tokens)]
+
+
+def _iter_batches(text, max_tokens, model):
+    """Yield (batch, number of lines of text complete once the batch is done)."""
+    if max_tokens < 1:
+        raise ValueError(f"max_tokens must be at least 1, got {max_tokens}")
+    current, current_tokens, complete = [], 0, 0
+    for index, line in enumerate(text.split('\n')):
+        tokens = count_tokens(line, model) + 1
+        pieces = [line] if tokens <= max_tokens else _split_long_line(line, max(1, max_tokens - 1), model)
+        for piece in pieces:
+            if len(pieces) > 1:
+                tokens = count_tokens(piece, model) + 1
+            if current and current_tokens + tokens > max_tokens:
+                yield '\n'.join(current), complete
+                current, current_tokens = [], 0
+            current.append(piece)
+            current_tokens += tokens
+        complete = index + 1
+    if current:
+        yield '\n'.join(current), complete
+
+
+def pack_lines(text, max_tokens, model=None):
+    """
+    Pack the lines of text into batches of at most max_tokens tokens each.
+    Lines stay whole and in order; only a line that alone exceeds the budget is cut.
+    Returns:
+        list: The batches, each a newline-joined string
+    """
+    return [batch for batch, _ in _iter_batches(text, max_tokens, model)]
+
+
+def take_batches(text, max_tokens, max_batches, model=None):
+    """
+    Split text into the lines that fit into max_batches batches of pack_lines and the rest.
+    A line cut across the last of those batches belongs to the rest. If the
+    first line alone needs more than max_batches batches, head is its
+    beginning and the rest of that line is dropped, so head is never empty.
+    Returns:
+        tuple: (head, rest), both newline-joined; rest is "" if everything fits
+    """
+    pieces, complete = [], 0
+    for count, (batch, complete_after) in enumerate(_iter_batches(text, max_tokens, model), 1):
+        if count > max_batches:
+            break
+        pieces.append(batch)
+        complete = complete_after
+    else:
+        return text, ""
+    lines = text.split('\n')
+    if complete == 0:
+        # Every batch so far holds a piece of the first line
+        return ''.join(pieces), '\n'.join(lines[1:])
+    return '\n'.join(lines[:complete]), '\n'.join(lines[complete:])
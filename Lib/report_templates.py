@@ -0,0 +1,34 @@
+class CategoryFragments:
+    """
+    Report pieces that only depend on the category, rendered once per category.
+    Icon and colour come from the config's 'categories' section, falling back
+    to default_icon / default_color. templates maps a fragment name to a
+    str.format template using {category}, {icon} and {color}.
+    """
+
+    def __init__(self, config, default_icon, default_color, **templates):
+        self._categories = config.get('categories', {})
+        self._default_icon = default_icon
+        self._default_color = default_color
+        self._templates = templates
+        self._styles = {}
+        self._fragments = {}
+
+    def style(self, category):
+        """Return (icon, color) of category."""
+        style = self._styles.get(category)
+        if style is None:
+            category_config = self._categories.get(category, {})
+            style = (category_config.get('icon', self._default_icon),
+                     category_config.get('color', self._default_color))
+            self._styles[category] = style
+        return style
+
+    def render(self, name, category):
+        key = (name, category)
+        fragment = self._fragments.get(key)
+        if fragment is None:
+            icon, color = self.style(category)
+            fragment = self._templates[name].format(category=category, icon=icon, color=color)
+            self._fragments[key] = fragment
+        return fragment
@@ -0,0 +1,73 @@
+import threading
+
+# Closes the document while the run is still going and reloads the page every
+# 15 seconds, so an open report follows the run. close() replaces it with the real tail.
+PROGRESS_TAIL = """
+<p class="text-center text-muted"><em>Report in progress, more sources are being processed...</em></p>
+<script>setTimeout(function () { location.reload(); }, 15000);</script>
+</body>
+</html>
+"""
+
+
+class StreamingReportWriter:
+    """
+    Writes an HTML report to disk piece by piece.
+    The file is kept a complete document: head, everything written so far
+    and a placeholder tail. Every write puts its piece and a new placeholder
+    over the previous placeholder and flushes, so each piece is on
+    disk as soon as it is written and a crashed run leaves the report of
+    every source that finished. Nothing but the current piece is held in memory.
+    """
+
+    def __init__(self, path, head, tail, progress_tail=PROGRESS_TAIL):
+        self.path = path
+        self._tail = tail
+        self._progress_tail = progress_tail
+        self._lock = threading.Lock()
+        self._file = open(path, "w", encoding="utf-8")
+        self._file.write(head)
+        self._offset = self._file.tell()
+        self._replace_tail("", self._progress_tail)
+
+    def _replace_tail(self, html, tail):
+        self._file.seek(self._offset)
+        self._file.write(html)
+        # tell() gives the offset after newline translation, as written to disk
+        self._offset = self._file.tell()
+        self._file.write(tail)
+        self._file.truncate()
+        self._file.flush()
+
+    def write(self, html):
+        with self._lock:
+            self._replace_tail(html, self._progress_tail)
+
+    def close(self):
+        with self._lock:
+            if self._file.closed:
+                return
+            self._replace_tail("", self._tail)
+            self._file.close()
+
+
+class OrderedResults:
+    """
+    Passes results to emit in a fixed key order, each as soon as it and
+    every result before it have arrived. Only results that arrive ahead of
+    their turn are buffered.
+    """
+
+    def __init__(self, order, emit):
+        self._order = list(order)
+        self._next = 0
+        self._pending = {}
+        self._emit = emit
+        self._lock = threading.Lock()
+
+    def add(self, key, result):
+        with self._lock:
+            self._pending[key] = result
+            while self._next < len(self._order) and self._order[self._next] in self._pending:
+                self._emit(self._pending.pop(self._order[self._next]))
+                self._next += 1
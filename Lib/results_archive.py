@@ -0,0 +1,213 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+
+
+class ResultsArchive:
+    """
+    Every run's results in one SQLite file, with an FTS5 index over the analyses.
+
+    runs:     one row per ai-news / ai-news-deep run, with the config sections
+              needed to render its report again
+    results:  one row per source and run (URL, category, keywords, error)
+    analyses: one row per analysis; a news source has at most one, a deep
+              crawl source one per analysed subpage
+    analyses_fts indexes URL, category, keywords and text of every analysis.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS runs (
+                id INTEGER PRIMARY KEY,
+                kind TEXT NOT NULL,
+                timestamp REAL NOT NULL,
+                report_path TEXT,
+                config TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS results (
+                id INTEGER PRIMARY KEY,
+                run_id INTEGER NOT NULL REFERENCES runs(id),
+                source_index INTEGER NOT NULL,
+                url TEXT NOT NULL,
+                category TEXT NOT NULL,
+                keywords TEXT NOT NULL,
+                error TEXT,
+                UNIQUE (run_id, source_index)
+            );
+            CREATE TABLE IF NOT EXISTS analyses (
+                id INTEGER PRIMARY KEY,
+                result_id INTEGER NOT NULL REFERENCES results(id),
+                position INTEGER NOT NULL,
+                url TEXT NOT NULL,
+                category TEXT NOT NULL,
+                keywords TEXT NOT NULL,
+                timestamp REAL NOT NULL,
+                analysis TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS analyses_result ON analyses(result_id, position);
+            CREATE INDEX IF NOT EXISTS analyses_timestamp ON analyses(timestamp);
+            CREATE VIRTUAL TABLE IF NOT EXISTS analyses_fts USING fts5(
+                url, category, keywords, analysis,
+                content='analyses', content_rowid='id', tokenize='unicode61 remove_diacritics 2'
+            );
+            CREATE TRIGGER IF NOT EXISTS analyses_fts_insert AFTER INSERT ON analyses BEGIN
+                INSERT INTO analyses_fts(rowid, url, category, keywords, analysis)
+                VALUES (new.id, new.url, new.category, new.keywords, new.analysis);
+            END;
+            CREATE TRIGGER IF NOT EXISTS analyses_fts_delete AFTER DELETE ON analyses BEGIN
+                INSERT INTO analyses_fts(analyses_fts, rowid, url, category, keywords, analysis)
+                VALUES ('delete', old.id, old.url, old.category, old.keywords, old.analysis);
+            END;
+            CREATE TRIGGER IF NOT EXISTS analyses_fts_update AFTER UPDATE ON analyses BEGIN
+                INSERT INTO analyses_fts(analyses_fts, rowid, url, category, keywords, analysis)
+                VALUES ('delete', old.id, old.url, old.category, old.keywords, old.analysis);
+                INSERT INTO analyses_fts(rowid, url, category, keywords, analysis)
+                VALUES (new.id, new.url, new.category, new.keywords, new.analysis);
+            END;
+            -- Left behind by archives that replaced results rows instead of updating them
+            DELETE FROM analyses WHERE result_id NOT IN (SELECT id FROM results);
+        """)
+        self._conn.commit()
+
+    def start_run(self, kind, timestamp, config, report_path=None):
+        """
+        Register a run; kind is 'news' or 'deep'.
+        Returns:
+            int: The run id to pass to record()
+        """
+        # Only what the report renderers read from the config is kept
+        report_config = {"categories": config.get("categories", {})}
+        with self._lock, self._conn:
+            return self._conn.execute(
+                "INSERT INTO runs (kind, timestamp, report_path, config) VALUES (?, ?, ?, ?)",
+                (kind, timestamp, report_path, json.dumps(report_config))).lastrowid
+
+    def record(self, run_id, source_index, result):
+        """Store one source's result (ai-news or ai-news-deep format) as soon as it is done."""
+        if "subpages" in result:
+            analyses = [(subpage["url"], subpage["analysis"]) for subpage in result["subpages"]]
+        else:
+            analyses = [(result["url"], result["analysis"])] if result.get("analysis") else []
+        keywords = ", ".join(result["keywords"])
+        now = time.time()
+        with self._lock, self._conn:
+            # Recording a source again replaces its result and analyses, keeping the row id
+            self._conn.execute(
+                "INSERT INTO results (run_id, source_index, url, category, keywords, error) "
+                "VALUES (?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (run_id, source_index) DO UPDATE SET "
+                "url = excluded.url, category = excluded.category, keywords = excluded.keywords, "
+                "error = excluded.error",
+                (run_id, source_index, result["url"], result["category"], json.dumps(result["keywords"]),
+                 result.get("error")))
+            result_id = self._conn.execute(
+                "SELECT id FROM results WHERE run_id = ? AND source_index = ?",
+                (run_id, source_index)).fetchone()[0]
+            self._conn.execute("DELETE FROM analyses WHERE result_id = ?", (result_id,))
+            self._conn.executemany(
+                "INSERT INTO analyses (result_id, position, url, category, keywords, timestamp, analysis) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [(result_id, position, url, result["category"], keywords, now, analysis)
+                 for position, (url, analysis) in enumerate(analyses)])
+
+    def search(self, query, category=None, since=None, limit=20, raw=False):
+        """
+        Full-text search over all analyses, best matches first.
+        Every word of query has to occur; words like gpt-4 or c++ are searched
+        as written. With raw, query is passed on in FTS5 syntax
+        ("phrases", OR, NOT, prefix*, column:term).
+        Raises sqlite3.OperationalError for a raw query FTS5 can't parse.
+        Returns:
+            list: dicts with run_id, timestamp, url, category, snippet
+        """
+        if not raw:
+            query = quote_fts_query(query)
+        sql = """
+            SELECT results.run_id, analyses.timestamp, analyses.url, analyses.category,
+                   snippet(analyses_fts, 3, '[', ']', ' ... ', 24)
+            FROM analyses_fts
+            JOIN analyses ON analyses.id = analyses_fts.rowid
+            JOIN results ON results.id = analyses.result_id
+            WHERE analyses_fts MATCH ?"""
+        parameters = [query]
+        if category:
+            sql += " AND analyses.category = ?"
+            parameters.append(category)
+        if since is not None:
+            sql += " AND analyses.timestamp >= ?"
+            parameters.append(since)
+        sql += " ORDER BY rank LIMIT ?"
+        parameters.append(limit)
+        with self._lock:
+            rows = self._conn.execute(sql, parameters).fetchall()
+        return [
+            {"run_id": row[0], "timestamp": row[1], "url": row[2], "category": row[3], "snippet": row[4]}
+            for row in rows
+        ]
+
+    def list_runs(self, limit=20):
+        """Most recent runs first, with their number of sources and analyses."""
+        with self._lock:
+            rows = self._conn.execute("""
+                SELECT runs.id, runs.kind, runs.timestamp, runs.report_path,
+                       (SELECT COUNT(*) FROM results WHERE results.run_id = runs.id),
+                       (SELECT COUNT(*) FROM analyses JOIN results ON results.id = analyses.result_id
+                        WHERE results.run_id = runs.id)
+                FROM runs ORDER BY runs.timestamp DESC, runs.id DESC LIMIT ?""", (limit,)).fetchall()
+        return [
+            {"id": row[0], "kind": row[1], "timestamp": row[2], "report_path": row[3],
+             "sources": row[4], "analyses": row[5]}
+            for row in rows
+        ]
+
+    def load_run(self, run_id):
+        """
+        Rebuild a run's results in the format its script's generate_html_report takes.
+        Returns:
+            tuple: (kind, timestamp, report config, results), or None for an unknown run
+        """
+        with self._lock:
+            run = self._conn.execute(
+                "SELECT kind, timestamp, config FROM runs WHERE id = ?", (run_id,)).fetchone()
+            if run is None:
+                return None
+            kind, timestamp, config = run
+            rows = self._conn.execute(
+                "SELECT id, url, category, keywords, error FROM results WHERE run_id = ? ORDER BY source_index",
+                (run_id,)).fetchall()
+            results = []
+            for result_id, url, category, keywords, error in rows:
+                analyses = self._conn.execute(
+                    "SELECT url, analysis FROM analyses WHERE result_id = ? ORDER BY position",
+                    (result_id,)).fetchall()
+                result = {"url": url, "keywords": json.loads(keywords), "category": category, "error": error}
+                if kind == 'deep':
+                    result["subpages"] = [{"url": page_url, "analysis": analysis} for page_url, analysis in analyses]
+                else:
+                    result["analysis"] = analyses[0][1] if analyses else None
+                results.append(result)
+        return kind, timestamp, json.loads(config), results
+
+    def close(self):
+        with self._lock:
+            self._conn.commit()
+            self._conn.close()
+
+
+def quote_fts_query(query):
+    """Quote each whitespace-separated term so FTS5 reads it as text, not as query syntax."""
+    return " ".join('"' + term.replace('"', '""') + '"' for term in query.split())
+
+
+def open_results_archive(config, state_directory):
+    """Open the archive configured under 'archive', or return None if it is disabled."""
+    archive_config = config.get('archive', {})
+    if not archive_config.get('enabled', True):
+        return None
+    path = archive_config.get('path') or os.path.join(state_directory, 'archive.sqlite')
+    return ResultsArchive(path)
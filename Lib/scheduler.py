@@ -0,0 +1,226 @@
+import time
+import traceback
+from datetime import datetime, timedelta
+
+# Longest single sleep, so a changed system clock or a wake from standby is noticed
+MAX_SLEEP_SECONDS = 60
+
+
+class CronTrigger:
+    """
+    Standard five-field cron expression in local time: minute hour day month weekday.
+    Fields take *, numbers, ranges (1-5), lists (1,15) and steps (*/15, 8-18/2);
+    weekday 0 or 7 is Sunday. As in cron, if both day and weekday are
+    restricted a day matching either of them fires.
+    """
+
+    _RANGES = [(0, 59), (0, 23), (1, 31), (1, 12), (0, 7)]
+
+    def __init__(self, expression):
+        fields = expression.split()
+        if len(fields) != 5:
+            raise ValueError(f"Cron expression needs 5 fields, got {len(fields)}: {expression!r}")
+        self.expression = expression
+        self.minutes, self.hours, self.days, self.months, weekdays = (
+            self._parse_field(field, low, high) for field, (low, high) in zip(fields, self._RANGES))
+        self.weekdays = {day % 7 for day in weekdays}
+        self._any_day = fields[2] == '*'
+        self._any_weekday = fields[4] == '*'
+
+    @staticmethod
+    def _parse_field(field, low, high):
+        values = set()
+        for part in field.split(','):
+            value_range, _, step = part.partition('/')
+            if value_range == '*':
+                start, end = low, high
+            elif '-' in value_range:
+                start, end = (int(value) for value in value_range.split('-', 1))
+            else:
+                start = int(value_range)
+                end = high if step else start
+            step = int(step) if step else 1
+            if not low <= start <= end <= high or step < 1:
+                raise ValueError(f"Invalid cron field {field!r}, values must be within {low}-{high}")
+            values.update(range(start, end + 1, step))
+        return values
+
+    def _day_matches(self, moment):
+        day_match = moment.day in self.days
+        weekday_match = (moment.weekday() + 1) % 7 in self.weekdays
+        if self._any_day:
+            return weekday_match
+        if self._any_weekday:
+            return day_match
+        return day_match or weekday_match
+
+    def next_run(self, after):
+        """First matching minute strictly after the given datetime."""
+        moment = after.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        # Whole months, days and hours are skipped at once; five years cover every valid expression
+        limit = moment + timedelta(days=5 * 366)
+        while moment < limit:
+            if moment.month not in self.months:
+                moment = (moment.replace(day=1) + timedelta(days=32)).replace(day=1, hour=0, minute=0)
+            elif not self._day_matches(moment):
+                moment = (moment + timedelta(days=1)).replace(hour=0, minute=0)
+            elif moment.hour not in self.hours:
+                moment = (moment + timedelta(hours=1)).replace(minute=0)
+            elif moment.minute not in self.minutes:
+                moment += timedelta(minutes=1)
+            else:
+                return moment
+        raise ValueError(f"Cron expression never fires: {self.expression!r}")
+
+    def __str__(self):
+        return f"cron '{self.expression}'"
+
+
+class IntervalTrigger:
+    """Runs a job again the given number of seconds after its last run finished; 0 = right away."""
+
+    def __init__(self, seconds):
+        self.seconds = seconds
+
+    def next_run(self, after):
+        return after + timedelta(seconds=self.seconds)
+
+    def __str__(self):
+        return f"every {self.seconds}s" if self.seconds else "continuously"
+
+
+class JobMetrics:
+    """Run counts and timings of one job."""
+
+    def __init__(self):
+        self.runs = 0
+        self.failures = 0
+        self.consecutive_failures = 0
+        self.total_seconds = 0.0
+        self.min_seconds = None
+        self.max_seconds = None
+        self.last_seconds = None
+        self.last_error = None
+        self.last_finished = None
+
+    def record(self, seconds, error=None):
+        self.runs += 1
+        self.total_seconds += seconds
+        self.last_seconds = seconds
+        self.min_seconds = seconds if self.min_seconds is None else min(self.min_seconds, seconds)
+        self.max_seconds = seconds if self.max_seconds is None else max(self.max_seconds, seconds)
+        self.last_finished = datetime.now()
+        if error is None:
+            self.consecutive_failures = 0
+        else:
+            self.failures += 1
+            self.consecutive_failures += 1
+            self.last_error = error
+
+    @property
+    def average_seconds(self):
+        return self.total_seconds / self.runs if self.runs else 0.0
+
+    def summary(self):
+        if not self.runs:
+            return "no runs yet"
+        return (f"{self.runs} runs, {self.failures} failed, "
+                f"last {self.last_seconds:.1f}s, avg {self.average_seconds:.1f}s, "
+                f"min {self.min_seconds:.1f}s, max {self.max_seconds:.1f}s")
+
+
+class Job:
+    """
+    A function the scheduler calls on its trigger.
+    A run fails if func raises (SystemExit included). Failed runs are retried
+    after backoff_base, 2 * backoff_base, 4 * backoff_base, ... seconds, at most
+    backoff_max; after max_retries failed retries the job waits for its trigger again.
+    """
+
+    def __init__(self, name, func, trigger, run_at_start=False, backoff_base=30, backoff_max=3600,
+                 max_retries=None):
+        self.name = name
+        self.func = func
+        self.trigger = trigger
+        self.run_at_start = run_at_start
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.max_retries = max_retries
+        self.metrics = JobMetrics()
+        self.next_run = None
+        self.retries = 0
+
+    def retry_delay(self, failed):
+        """
+        Seconds until the job is retried after a run, or None if it waits for its trigger.
+        Counts the retry, or starts counting afresh once the job goes back to its trigger.
+        """
+        if failed and (self.max_retries is None or self.retries < self.max_retries):
+            self.retries += 1
+            return min(self.backoff_base * 2 ** (self.retries - 1), self.backoff_max)
+        self.retries = 0
+        return None
+
+
+class Scheduler:
+    """
+    Runs jobs in this process, one at a time, each when it is due.
+    Everything the jobs import and the API clients they create stay loaded
+    between runs. Jobs never overlap: a job that becomes due while another
+    one runs starts as soon as that one has finished, earliest due first.
+    """
+
+    def __init__(self, jobs, log=print):
+        self.jobs = list(jobs)
+        self.log = log
+        now = datetime.now()
+        for job in self.jobs:
+            job.next_run = now if job.run_at_start else job.trigger.next_run(now)
+
+    def run_job(self, job):
+        self.log(f"[INFO] Starting job {job.name}")
+        started = time.perf_counter()
+        error = None
+        try:
+            job.func()
+        except (Exception, SystemExit) as e:
+            error = f"{type(e).__name__}: {e}"
+            self.log(f"[ERROR] Job {job.name} failed: {error}")
+            traceback.print_exc()
+        job.metrics.record(time.perf_counter() - started, error)
+        self.log(f"[INFO] Job {job.name} finished in {job.metrics.last_seconds:.1f}s ({job.metrics.summary()})")
+
+        now = datetime.now()
+        backoff = job.retry_delay(failed=error is not None)
+        if backoff is not None:
+            job.next_run = now + timedelta(seconds=backoff)
+            self.log(f"[WARNING] Retrying job {job.name} in {backoff}s (retry {job.retries})")
+        else:
+            job.next_run = job.trigger.next_run(now)
+            self.log(f"[DEBUG] Next run of job {job.name}: {job.next_run:%Y-%m-%d %H:%M:%S}")
+
+    def run_pending(self):
+        """
+        Run the earliest due job, if any.
+        Returns:
+            bool: Whether a job ran
+        """
+        due = [job for job in self.jobs if job.next_run <= datetime.now()]
+        if not due:
+            return False
+        self.run_job(min(due, key=lambda job: job.next_run))
+        return True
+
+    def run_forever(self):
+        for job in self.jobs:
+            self.log(f"[INFO] Job {job.name}: {job.trigger}, first run {job.next_run:%Y-%m-%d %H:%M:%S}")
+        while True:
+            if not self.run_pending():
+                wait = (min(job.next_run for job in self.jobs) - datetime.now()).total_seconds()
+                time.sleep(min(max(wait, 0), MAX_SLEEP_SECONDS))
+
+    def print_metrics(self):
+        for job in self.jobs:
+            self.log(f"[INFO] Job {job.name}: {job.metrics.summary()}")
+            if job.metrics.last_error:
+                self.log(f"[INFO]   last error: {job.metrics.last_error}")
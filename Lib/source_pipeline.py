@@ -0,0 +1,90 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
+from urllib.parse import urlparse
+
+
+class SourcePipeline:
+    """
+    Runs a per-source function on a thread pool.
+    Fetches and LLM calls are throttled independently, and no host gets
+    more than `per_host` concurrent fetches.
+    """
+
+    def __init__(self, workers=8, max_fetches=8, max_llm_calls=4, per_host=2):
+        self.workers = max(1, workers)
+        self.per_host = max(1, per_host)
+        self._fetch_slots = threading.BoundedSemaphore(max(1, max_fetches))
+        self._llm_slots = threading.BoundedSemaphore(max(1, max_llm_calls))
+        self._host_slots = {}
+        self._lock = threading.Lock()
+
+    def _host_slot(self, url):
+        host = urlparse(url).netloc.lower()
+        with self._lock:
+            slot = self._host_slots.get(host)
+            if slot is None:
+                slot = threading.BoundedSemaphore(self.per_host)
+                self._host_slots[host] = slot
+        return slot
+
+    @contextmanager
+    def fetch_slot(self, url):
+        # Take the host slot first so a busy host doesn't hold a global slot while waiting
+        with self._host_slot(url):
+            with self._fetch_slots:
+                yield
+
+    @contextmanager
+    def llm_slot(self):
+        with self._llm_slots:
+            yield
+
+    def run(self, items, func, on_result=None):
+        """
+        Apply func to every item.
+        on_result: called as on_result(index, result) as soon as each item is done,
+            in completion order; the results are then not collected
+        Returns:
+            list: Results in the same order as items, regardless of completion order,
+                or None when on_result is given
+        """
+        items = list(items)
+        if self.workers == 1 or len(items) <= 1:
+            if on_result is None:
+                return [func(item) for item in items]
+            for index, item in enumerate(items):
+                on_result(index, func(item))
+            return None
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            if on_result is None:
+                return list(executor.map(func, items))
+            futures = {executor.submit(func, item): index for index, item in enumerate(items)}
+            for future in as_completed(futures):
+                on_result(futures[future], future.result())
+            return None
+
+
+def add_pipeline_arguments(parser):
+    """Register the concurrency options shared by the news scripts."""
+    parser.add_argument('--workers', '-w',
+                      help='Number of sources processed in parallel (default: 8, 1 = sequential)',
+                      type=int, default=8)
+    parser.add_argument('--max-fetches',
+                      help='Maximum concurrent page fetches (default: 8)',
+                      type=int, default=8)
+    parser.add_argument('--max-llm-calls',
+                      help='Maximum concurrent LLM requests (default: 4)',
+                      type=int, default=4)
+    parser.add_argument('--per-host',
+                      help='Maximum concurrent fetches per host (default: 2)',
+                      type=int, default=2)
+
+
+def pipeline_from_args(args):
+    return SourcePipeline(
+        workers=args.workers,
+        max_fetches=args.max_fetches,
+        max_llm_calls=args.max_llm_calls,
+        per_host=args.per_host
+    )
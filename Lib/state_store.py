@@ -0,0 +1,205 @@
+import argparse
+import atexit
+import json
+import os
+import sqlite3
+import threading
+import time
+
+DEFAULT_BATCH_SIZE = 100
+
+
+def _json_state_filename(directory, key):
+    return os.path.join(directory, f"state_{key}.json")
+
+
+class StateStore:
+    """
+    Per-URL page state in a single SQLite file, replacing one state_<md5>.json per URL.
+    Rows are keyed by the same md5 of the URL the JSON files were named after.
+    Writes are buffered and committed in one transaction every batch_size
+    saves and on flush() / close(); reads see buffered writes.
+    A key missing from the database is looked up in json_directory and imported,
+    so old state keeps working before it has been migrated.
+    """
+
+    def __init__(self, path, json_directory=None, batch_size=DEFAULT_BATCH_SIZE):
+        self.path = path
+        self.json_directory = json_directory
+        self.batch_size = max(1, batch_size)
+        self._lock = threading.Lock()
+        self._pending = {}  # key -> state, not yet written to disk
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS states (
+                key TEXT PRIMARY KEY,
+                last_processed REAL,
+                state TEXT NOT NULL
+            )""")
+        self._conn.commit()
+
+    def load(self, key):
+        """Return the stored state dict for key, or None."""
+        with self._lock:
+            state = self._pending.get(key)
+            if state is not None:
+                return state
+            row = self._conn.execute("SELECT state FROM states WHERE key = ?", (key,)).fetchone()
+            if row is not None:
+                return json.loads(row[0])
+            state = self._read_json_state(key)
+            if state is not None:
+                self._queue(key, state)
+            return state
+
+    def save(self, key, state):
+        with self._lock:
+            self._queue(key, state)
+
+    def _queue(self, key, state):
+        self._pending[key] = state
+        if len(self._pending) >= self.batch_size:
+            self._write_pending()
+
+    def _write_pending(self):
+        if not self._pending:
+            return
+        with self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO states (key, last_processed, state) VALUES (?, ?, ?)",
+                [(key, state.get('last_processed'), json.dumps(state, separators=(',', ':')))
+                 for key, state in self._pending.items()])
+        self._pending.clear()
+
+    def _read_json_state(self, key):
+        if self.json_directory is None:
+            return None
+        try:
+            with open(_json_state_filename(self.json_directory, key), 'r') as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def flush(self):
+        with self._lock:
+            self._write_pending()
+
+    def migrate(self, remove_files=True):
+        """
+        Import every state_<md5>.json in json_directory that isn't in the database yet.
+        Returns:
+            int: Number of files imported
+        """
+        if self.json_directory is None:
+            return 0
+        imported = 0
+        files = []
+        with self._lock:
+            for filename in sorted(os.listdir(self.json_directory)):
+                if not (filename.startswith('state_') and filename.endswith('.json')):
+                    continue
+                key = filename[len('state_'):-len('.json')]
+                files.append(os.path.join(self.json_directory, filename))
+                if key in self._pending or self._conn.execute(
+                        "SELECT 1 FROM states WHERE key = ?", (key,)).fetchone() is not None:
+                    continue
+                state = self._read_json_state(key)
+                if state is None:
+                    print(f"[WARNING] Skipping unreadable state file {filename}")
+                    files.pop()
+                    continue
+                self._queue(key, state)
+                imported += 1
+            self._write_pending()
+        # Only delete the files once their content is committed
+        if remove_files:
+            for filename in files:
+                os.remove(filename)
+        return imported
+
+    def compact(self, older_than_days=None):
+        """
+        Drop states not processed for older_than_days (if given) and rebuild the database file.
+        Returns:
+            int: Number of states removed
+        """
+        with self._lock:
+            self._write_pending()
+            removed = 0
+            if older_than_days is not None:
+                cutoff = time.time() - older_than_days * 86400
+                with self._conn:
+                    removed = self._conn.execute(
+                        "DELETE FROM states WHERE last_processed IS NULL OR last_processed < ?",
+                        (cutoff,)).rowcount
+            self._conn.execute("VACUUM")
+            return removed
+
+    def count(self):
+        with self._lock:
+            self._write_pending()
+            return self._conn.execute("SELECT COUNT(*) FROM states").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._write_pending()
+            self._conn.close()
+
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def get_state_store(path, json_directory=None):
+    """Return the shared store for path, opening it on first use."""
+    path = os.path.abspath(path)
+    with _stores_lock:
+        store = _stores.get(path)
+        if store is None:
+            store = StateStore(path, json_directory)
+            _stores[path] = store
+        return store
+
+
+def flush_state_stores():
+    """Write the pending states of every open store, e.g. after each run of a long-lived process."""
+    with _stores_lock:
+        for store in _stores.values():
+            store.flush()
+
+
+@atexit.register
+def _close_stores():
+    with _stores_lock:
+        for store in _stores.values():
+            store.close()
+        _stores.clear()
+
+
+def main():
+    from Lib.pdf_audio_tools.state import get_state_directory, get_state_database_path
+
+    parser = argparse.ArgumentParser(description='Maintain the ai-news state database')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    migrate_parser = subparsers.add_parser('migrate', help='Import state_*.json files into the database')
+    migrate_parser.add_argument('--keep-files', action='store_true',
+                                help='Leave the JSON files in place after importing them')
+    compact_parser = subparsers.add_parser('compact', help='Remove old states and shrink the database file')
+    compact_parser.add_argument('--older-than-days', type=float, default=None,
+                                help='Remove states not processed for this many days (default: keep all)')
+    args = parser.parse_args()
+
+    path = get_state_database_path()
+    store = get_state_store(path, get_state_directory())
+    if args.command == 'migrate':
+        imported = store.migrate(remove_files=not args.keep_files)
+        print(f"[INFO] Imported {imported} JSON state files into {path}")
+    else:
+        size_before = os.path.getsize(path)
+        removed = store.compact(args.older_than_days)
+        print(f"[INFO] Removed {removed} states, {store.count()} left, "
+              f"{size_before / 1e6:.1f} MB -> {os.path.getsize(path) / 1e6:.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
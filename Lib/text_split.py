@@ -1,5 +1,7 @@
+import io
 import os
 import re
+import codecs
 
 def read_text_file(file_path):
     with open(file_path, 'r', encoding='utf-8') as file:
@@ -12,39 +14,125 @@ def split_by_characters(text, max_chars):
         chunks.append(text[i:i+max_chars])
     return chunks
 
-def split_by_words(text, max_chunk_size):
-    chunks = []
-    words = text.split()
-    current_chunk = ""
+# Sentences end at . ! or ? followed by whitespace, paragraphs at a blank line
+SENTENCE_BOUNDARY = re.compile(r'(?<=[.!?])\s+')
+PARAGRAPH_BOUNDARY = re.compile(r'\n\s*\n')
+
 
-    for word in words:
-        if len(current_chunk) + len(word) + 1 <= max_chunk_size:
-            current_chunk += word + " "
+def pack_pieces(lengths, max_chunk_size, separator_length=1, trailing_separator=True):
+    """
+    Greedily group consecutive pieces into chunks of at most max_chunk_size
+    characters, working on the piece lengths only.
+    A piece is added while the chunk measured as "piece + separator" for every
+    piece (trailing_separator) or as "pieces joined by separator", plus the new
+    piece and one separator, stays within max_chunk_size. A piece that fits in
+    no chunk gets its own; if that is the first piece an empty chunk comes
+    first, as the string-building splitters always did.
+    Yields:
+        tuple: (start, end) piece index range of each chunk
+    """
+    start = 0
+    used = 0
+    index = -1
+    for index, length in enumerate(lengths):
+        if used + length + separator_length <= max_chunk_size:
+            used += length + separator_length if trailing_separator or index > start else length
         else:
-            chunks.append(current_chunk.strip())
-            current_chunk = word + " "
+            yield start, index
+            start = index
+            used = length + separator_length if trailing_separator else length
+    if index >= 0:
+        yield start, index + 1
 
-    if current_chunk:
-        chunks.append(current_chunk.strip())
 
-    return chunks
+def join_pieces(pieces, max_chunk_size, separator=" ", trailing_separator=True):
+    """Pack pieces with pack_pieces and join each chunk with separator, stripped."""
+    ranges = pack_pieces(map(len, pieces), max_chunk_size, len(separator), trailing_separator)
+    return [separator.join(pieces[start:end]).strip() for start, end in ranges]
+
+
+def join_piece_stream(pieces, max_chunk_size, separator=" ", trailing_separator=True):
+    """
+    join_pieces for an iterable of pieces: yields each chunk as soon as it is
+    complete and keeps only the pieces of the chunk being built.
+    """
+    pending = []
+    offset = 0  # piece index of pending[0]
+
+    def lengths():
+        for piece in pieces:
+            pending.append(piece)
+            yield len(piece)
+
+    for start, end in pack_pieces(lengths(), max_chunk_size, len(separator), trailing_separator):
+        yield separator.join(pending[start - offset:end - offset]).strip()
+        del pending[:end - offset]
+        offset = end
+
+
+def iter_file_sentences(file_path, block_size=1 << 20, progress=None):
+    """
+    The sentences of a UTF-8 text file, as SENTENCE_BOUNDARY.split(read_text_file(file_path))
+    would return them, read in blocks of block_size bytes. A boundary is only
+    accepted once the text after it has been read, since the whitespace might
+    go on in the next block; the unfinished sentence is carried over.
+    progress: called with the number of bytes read after every block
+    """
+    # Decodes like open(file_path, 'r', encoding='utf-8'), including the newline translation
+    decoder = io.IncrementalNewlineDecoder(codecs.getincrementaldecoder('utf-8')(), translate=True)
+    buffer = ""
+    scan = 0  # no boundary before this position of buffer can still be found
+    with open(file_path, 'rb') as file:
+        while True:
+            block = file.read(block_size)
+            final = not block
+            scan = min(scan, len(buffer))
+            buffer += decoder.decode(block, final=final)
+            if progress is not None:
+                progress(file.tell())
+            start = 0
+            next_scan = len(buffer)
+            for match in SENTENCE_BOUNDARY.finditer(buffer, scan):
+                if match.end() == len(buffer) and not final:
+                    next_scan = match.start()
+                    break
+                yield buffer[start:match.start()]
+                start = match.end()
+            buffer = buffer[start:]
+            scan = next_scan - start
+            if final:
+                break
+    yield buffer
+
+
+def split_by_words(text, max_chunk_size):
+    return join_pieces(text.split(), max_chunk_size)
 
 def split_by_sentences(text, max_chunk_size):
-    chunks = []
-    sentences = re.split(r'(?<=[.!?])\s+', text)
-    current_chunk = ""
+    return join_pieces(SENTENCE_BOUNDARY.split(text), max_chunk_size)
 
-    for sentence in sentences:
-        if len(current_chunk) + len(sentence) + 1 <= max_chunk_size:
-            current_chunk += sentence + " "
+def split_by_paragraphs(text, max_chunk_size):
+    """Paragraphs joined by blank lines; a paragraph longer than max_chunk_size is split into sentences."""
+    chunks = []
+    for chunk in join_pieces(PARAGRAPH_BOUNDARY.split(text), max_chunk_size, "\n\n"):
+        if len(chunk) > max_chunk_size:
+            chunks.extend(split_by_sentences(chunk, max_chunk_size))
         else:
-            chunks.append(current_chunk.strip())
-            current_chunk = sentence + " "
+            chunks.append(chunk)
+    return chunks
 
-    if current_chunk:
-        chunks.append(current_chunk.strip())
+SPLIT_STRATEGIES = {
+    'characters': split_by_characters,
+    'words': split_by_words,
+    'sentences': split_by_sentences,
+    'paragraphs': split_by_paragraphs,
+}
 
-    return chunks
+def split_text(text, max_chunk_size, strategy='sentences'):
+    """Split text into chunks of at most max_chunk_size characters (longer single words or sentences excepted)."""
+    if strategy not in SPLIT_STRATEGIES:
+        raise ValueError(f"Unknown split strategy: {strategy}")
+    return SPLIT_STRATEGIES[strategy](text, max_chunk_size)
 
 def test():
     data = read_text_file("C:/Projekte/Bücher-Als-Text/txt/Goldratt's Rules of Flow.txt")
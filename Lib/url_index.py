@@ -0,0 +1,99 @@
+import os
+import sqlite3
+import threading
+import time
+
+DEFAULT_REVISIT_AFTER_HOURS = 24
+
+
+class UrlIndex:
+    """
+    On-disk record of every subpage the deep crawler fetched: when it was last
+    fetched and the hash of its cleaned content once that was fully analysed.
+    Used to pick unseen and stale pages first and to skip unchanged content.
+    ETag / Last-Modified live in the page state, next to the content they belong to.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS urls (
+                url TEXT PRIMARY KEY,
+                first_seen REAL NOT NULL,
+                last_fetched REAL NOT NULL,
+                content_hash TEXT
+            )""")
+        self._conn.commit()
+
+    def get(self, url):
+        """Return the index entry for url as a dict, or None if it was never fetched."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT last_fetched, content_hash FROM urls WHERE url = ?", (url,)).fetchone()
+        if row is None:
+            return None
+        return {"last_fetched": row[0], "content_hash": row[1]}
+
+    def record_fetch(self, url, content_hash=None):
+        """
+        Record that url was fetched now and has nothing left to analyse.
+        content_hash only overwrites the stored hash when given.
+        """
+        now = time.time()
+        with self._lock:
+            self._conn.execute("""
+                INSERT INTO urls (url, first_seen, last_fetched, content_hash)
+                VALUES (?, ?, ?, ?)
+                ON CONFLICT(url) DO UPDATE SET
+                    last_fetched = excluded.last_fetched,
+                    content_hash = COALESCE(excluded.content_hash, content_hash)
+                """, (url, now, now, content_hash))
+            self._conn.commit()
+
+    def mark_unfinished(self, url):
+        """
+        Record that url still has content that wasn't analysed: its content hash
+        is cleared, so the next run diffs the page again instead of skipping it,
+        and its last fetch time stays as it was, so prioritize doesn't demote it.
+        """
+        with self._lock:
+            self._conn.execute("UPDATE urls SET content_hash = NULL WHERE url = ?", (url,))
+            self._conn.commit()
+
+    def prioritize(self, urls, revisit_after_hours=DEFAULT_REVISIT_AFTER_HOURS):
+        """
+        Order urls for crawling: never fetched ones first, in their given order,
+        then stale ones, least recently fetched first. URLs fetched within the
+        last revisit_after_hours come last, also least recently fetched first,
+        so they are only crawled when the page budget leaves room for them.
+        Returns:
+            tuple: (ordered urls, number of recently fetched urls moved to the end)
+        """
+        cutoff = time.time() - revisit_after_hours * 3600
+        last_fetched = {}
+        with self._lock:
+            for url in set(urls):
+                row = self._conn.execute("SELECT last_fetched FROM urls WHERE url = ?", (url,)).fetchone()
+                if row is not None:
+                    last_fetched[url] = row[0]
+        unseen = [url for url in urls if url not in last_fetched]
+        seen = sorted((url for url in urls if url in last_fetched), key=last_fetched.get)
+        stale = [url for url in seen if last_fetched[url] < cutoff]
+        recent = [url for url in seen if last_fetched[url] >= cutoff]
+        return unseen + stale + recent, len(recent)
+
+    def close(self):
+        with self._lock:
+            self._conn.commit()
+            self._conn.close()
+
+
+def open_url_index(config, state_directory):
+    """Open the index configured under 'url_index', or return None if it is disabled."""
+    index_config = config.get('url_index', {})
+    if not index_config.get('enabled', True):
+        return None
+    path = index_config.get('path') or os.path.join(state_directory, 'url_index.sqlite')
+    return UrlIndex(path)
@@ -0,0 +1,98 @@
+import os
+import sqlite3
+import argparse
+import importlib.util
+from datetime import datetime
+from Lib.pdf_audio_tools import get_state_directory, get_config
+from Lib.results_archive import open_results_archive
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Script whose generate_html_report renders each kind of run
+REPORT_SCRIPTS = {
+    'news': 'ai-news.py',
+    'deep': 'ai-news-deep.py'
+}
+
+def load_report_script(kind):
+    """Import the hyphenated script that produced runs of this kind."""
+    filename = REPORT_SCRIPTS[kind]
+    spec = importlib.util.spec_from_file_location(filename.replace('-', '_')[:-3], os.path.join(BASE_DIR, filename))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+def format_time(timestamp):
+    return datetime.fromtimestamp(timestamp).strftime("%d.%m.%Y %H:%M")
+
+def search(archive, args):
+    since = datetime.fromisoformat(args.since).timestamp() if args.since else None
+    try:
+        hits = archive.search(args.query, category=args.category, since=since, limit=args.limit, raw=args.raw)
+    except sqlite3.OperationalError as e:
+        print(f"[ERROR] Invalid search query {args.query!r}: {e}")
+        return
+    if not hits:
+        print("[INFO] No matching analyses found")
+        return
+    for hit in hits:
+        print(f"{format_time(hit['timestamp'])}  run {hit['run_id']}  [{hit['category']}]  {hit['url']}")
+        print(f"    {' '.join(hit['snippet'].split())}")
+
+def list_runs(archive, args):
+    for run in archive.list_runs(limit=args.limit):
+        print(f"{run['id']:>5}  {format_time(run['timestamp'])}  {run['kind']:<4}  "
+              f"{run['sources']:>3} sources  {run['analyses']:>4} analyses  {run['report_path'] or ''}")
+
+def regenerate(archive, args):
+    run = archive.load_run(args.run_id)
+    if run is None:
+        print(f"[ERROR] Unknown run: {args.run_id}")
+        return
+    kind, timestamp, report_config, results = run
+    html_content = load_report_script(kind).generate_html_report(results, timestamp, report_config)
+    output = args.output or f"archive_{kind}_{int(timestamp)}.html"
+    with open(output, 'w', encoding='utf-8') as f:
+        f.write(html_content)
+    print(f"[INFO] Report of run {args.run_id} written to {os.path.abspath(output)}")
+
+def main():
+    parser = argparse.ArgumentParser(description='Search past AI news results and regenerate their reports')
+    parser.add_argument('--config', '-c',
+                      help='Path to config file, for the archive settings (default: ai-news-config.json)',
+                      default='ai-news-config.json')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    search_parser = subparsers.add_parser('search', help='Full-text search over all analyses')
+    search_parser.add_argument('query',
+                      help='Words that all have to occur, e.g. "gpt-4 open weights"')
+    search_parser.add_argument('--raw',
+                      help='Treat the query as FTS5 syntax, e.g. \'"open weights" OR agent* NOT url:github\'',
+                      action='store_true')
+    search_parser.add_argument('--category', help='Only analyses of this category')
+    search_parser.add_argument('--since', help='Only analyses from this date on (YYYY-MM-DD)')
+    search_parser.add_argument('--limit', help='Maximum number of hits (default: 20)', type=int, default=20)
+    search_parser.set_defaults(handler=search)
+
+    list_parser = subparsers.add_parser('list', help='List the most recent runs')
+    list_parser.add_argument('--limit', help='Maximum number of runs (default: 20)', type=int, default=20)
+    list_parser.set_defaults(handler=list_runs)
+
+    regenerate_parser = subparsers.add_parser('regenerate', help='Write the HTML report of a past run again')
+    regenerate_parser.add_argument('run_id', help='Run id, as shown by list or search', type=int)
+    regenerate_parser.add_argument('--output', '-o',
+                      help='Report file (default: archive_<kind>_<timestamp>.html)')
+    regenerate_parser.set_defaults(handler=regenerate)
+
+    args = parser.parse_args()
+    archive = open_results_archive(get_config(args.config), get_state_directory())
+    if archive is None:
+        print("[ERROR] The results archive is disabled in the config")
+        return
+    try:
+        args.handler(archive, args)
+    finally:
+        archive.close()
+
+if __name__ == "__main__":
+    main()
@@ -2,46 +2,36 @@ import os
 import time
 import json
 import argparse
+import threading
 from datetime import datetime
-from urllib.parse import urljoin, urlparse
-from bs4 import BeautifulSoup
-import requests
+from urllib.parse import urlparse
 from Lib.pdf_audio_tools import (
-    clean_html,
+    parse_page,
+    set_html_backend,
+    set_state_backend,
     get_gpt4_analysis,
+    limit_analysis_content,
     load_previous_content,
     save_current_content,
     get_content_diff,
-    call_gpt,
-    load_config
+    hash_content,
+    get_state_directory,
+    get_conditional_headers,
+    get_validators,
+    NOT_MODIFIED,
+    get_config
 )
+from Lib.http_session import configure_fetch_client, get_fetch_client
+from Lib.llm_cache import set_llm_cache_bypass
+from Lib.link_filter import LinkMatcher
+from Lib.crawler import FrontierCrawler, normalize_url
+from Lib.url_index import DEFAULT_REVISIT_AFTER_HOURS, open_url_index
+from Lib.novelty import get_novelty_index
+from Lib.results_archive import open_results_archive
+from Lib.report_writer import StreamingReportWriter, OrderedResults
+from Lib.report_templates import CategoryFragments
 import random
 
-# Standard pages to exclude from crawling
-EXCLUDED_PATTERNS = [
-    # Legal & Company
-    'impressum', 'imprint', 'privacy', 'datenschutz', 'agb', 'terms', 
-    'kontakt', 'contact', 'about', 'uber-uns', 'team',
-    # Navigation & Utils
-    'suche', 'search', 'login', 'register', 'anmelden', 'registrieren',
-    'sitemap', 'archive', 'archiv', 'feeds', 'rss',
-    # Social Media
-    'facebook', 'twitter', 'instagram', 'linkedin', 'youtube',
-    # Shopping
-    'warenkorb', 'cart', 'checkout', 'shop', 'store',
-    # Account
-    'profile', 'profil', 'account', 'konto', 'settings', 'einstellungen',
-    # Newsletter
-    'newsletter', 'subscribe', 'abonnieren',
-    # Help
-    'help', 'hilfe', 'faq', 'support'
-]
-
-def is_excluded_url(url):
-    """Check if URL matches any excluded pattern."""
-    url_lower = url.lower()
-    return any(pattern in url_lower for pattern in EXCLUDED_PATTERNS)
-
 def is_same_domain(url1, url2):
     """Check if two URLs belong to the same main domain."""
     domain1 = urlparse(url1).netloc
@@ -51,29 +41,39 @@ def is_same_domain(url1, url2):
     domain2 = domain2.replace('www.', '')
     return domain1 == domain2
 
-def extract_links(html_content, base_url):
-    """Extract all links from HTML content that belong to the same domain."""
-    soup = BeautifulSoup(html_content, 'html.parser')
-    links = set()  # Using set to avoid duplicates
-    for a in soup.find_all('a', href=True):
-        href = a.get('href')
-        full_url = urljoin(base_url, href)
-        if is_same_domain(base_url, full_url):
-            links.add(full_url)
-    return list(links)
+def extract_links(page):
+    """Extract all links from a parsed page that belong to the same domain."""
+    return [link for link in page.links() if is_same_domain(page.url, link)]
 
-def is_relevant_link(url, keywords):
-    """Check if a URL is relevant based on keywords and not excluded."""
-    if is_excluded_url(url):
-        return False
-    url_lower = url.lower()
-    return any(keyword.lower() in url_lower for keyword in keywords)
+def fetch_page(url, page_cache, previous_state=None):
+    """
+    Fetch and parse a page at most once per crawl.
+    Returns (page, error, validators, size); the page carries both the cleaned text and the links,
+    size is the number of bytes downloaded.
+    """
+    cached = page_cache.get(url)
+    if cached is not None:
+        return cached[0], None, cached[1], 0
+    html_content, error, validators = get_website_content(url, previous_state)
+    if error:
+        return None, error, validators, 0
+    page = parse_page(html_content, url)
+    page_cache[url] = (page, validators)
+    return page, None, validators, len(html_content.encode('utf-8'))
 
-def process_source_deep(source, max_pages=5):
-    """Process a source by crawling through relevant links."""
+def process_source_deep(source, config, page_cache, llm_slots, url_index=None,
+                        revisit_after_hours=DEFAULT_REVISIT_AFTER_HOURS, **crawler_options):
+    """
+    Process a source by crawling through relevant links.
+    With a url_index, unseen and stale subpages are crawled first and pages
+    fetched within revisit_after_hours last.
+    crawler_options are passed to FrontierCrawler (max_depth, max_pages, time_budget, ...).
+    """
     base_url = source["url"]
     keywords = source["keywords"]
     category = source["category"]
+    matcher = LinkMatcher(keywords)
+    previous_states = {}
     
     result = {
         "url": base_url,
@@ -85,105 +85,144 @@ def process_source_deep(source, max_pages=5):
     
     print(f"\n[DEBUG] Processing source deeply: {base_url}")
     
-    # Step 1: Get main page content
-    print("[DEBUG] Fetching main page...")
-    html_content, error = get_website_content(base_url)
-    if error:
-        result["error"] = f"Failed to fetch main page: {error}"
-        return result
-    
-    # Step 2: Extract all links
-    print("[DEBUG] Extracting all links...")
-    all_links = extract_links(html_content, base_url)
-    print(f"[INFO] Found {len(all_links)} total links:")
-    for link in all_links:
-        print(f"  - {link}")
-    
-    # Step 3: Filter out excluded links
-    print("\n[DEBUG] Filtering out excluded links...")
-    valid_links = [link for link in all_links if not is_excluded_url(link)]
-    print(f"[INFO] {len(valid_links)} links remain after exclusion:")
-    for link in valid_links:
-        print(f"  - {link}")
-    
-    # Step 4: Filter for relevant links
-    print("\n[DEBUG] Filtering for relevant links...")
-    relevant_links = [link for link in valid_links if is_relevant_link(link, keywords)]
-    print(f"[INFO] {len(relevant_links)} relevant links found:")
-    for link in relevant_links:
-        print(f"  - {link}")
+    def fetch(url):
+        if url == base_url:
+            print("[DEBUG] Fetching main page...")
+            return fetch_page(url, page_cache)
+        print(f"\n[DEBUG] Processing: {url}")
+        # Revalidate against the stored ETag / Last-Modified
+        previous_state = load_previous_content(url)
+        previous_states[url] = previous_state
+        return fetch_page(url, page_cache, previous_state)
     
-    # Step 5: Randomly select max_pages links
-    if len(relevant_links) > max_pages:
-        print(f"\n[DEBUG] Randomly selecting {max_pages} links for processing...")
-        selected_links = random.sample(relevant_links, max_pages)
-    else:
-        selected_links = relevant_links
-    print(f"[INFO] Selected {len(selected_links)} links for processing:")
-    for link in selected_links:
-        print(f"  - {link}")
-    
-    # Step 6: Process selected links
-    print("\n[DEBUG] Processing selected links...")
-    for link in selected_links:
-        print(f"\n[DEBUG] Processing: {link}")
+    def select_links(page, depth):
+        # Step 2: Extract all links
+        print(f"[DEBUG] Extracting all links from {page.url}...")
+        all_links = extract_links(page)
+        print(f"[INFO] Found {len(all_links)} total links:")
+        for link in all_links:
+            print(f"  - {link}")
+        
+        # Step 3: Filter out excluded links (the matcher also yields the relevant ones for step 4)
+        print("\n[DEBUG] Filtering out excluded links...")
+        valid_links, relevant_links = matcher.filter_links(all_links)
+        print(f"[INFO] {len(valid_links)} links remain after exclusion:")
+        for link in valid_links:
+            print(f"  - {link}")
         
-        # Get subpage content
-        subpage_html, error = get_website_content(link)
-        if error:
-            print(f"[WARNING] Failed to fetch subpage {link}: {error}")
-            continue
+        # Step 4: Filter for relevant links
+        print("\n[DEBUG] Filtering for relevant links...")
+        print(f"[INFO] {len(relevant_links)} relevant links found:")
+        for link in relevant_links:
+            print(f"  - {link}")
+        
+        # Step 5: Random order, the crawler takes links until the page budget is used up
+        random.shuffle(relevant_links)
+        if url_index is not None:
+            # Unseen pages first, then the stalest; recently fetched ones only if the budget allows
+            relevant_links, recent = url_index.prioritize(
+                [normalize_url(link) for link in relevant_links], revisit_after_hours)
+            print(f"[INFO] {recent} links fetched within the last {revisit_after_hours}h moved to the end")
+        return relevant_links
+    
+    def process(crawled):
+        link = crawled.url
+        if crawled.error == NOT_MODIFIED:
+            print(f"[INFO] No new content in {link} (not modified)")
+            if url_index is not None:
+                url_index.record_fetch(link)
+            return None
+        if crawled.error:
+            print(f"[WARNING] Failed to fetch subpage {link}: {crawled.error}")
+            return None
         
-        # Clean and analyze subpage content
-        cleaned_content = clean_html(subpage_html)
+        # Cleaned text comes from the same parse that yields the subpage's links
+        cleaned_content = crawled.page.text
         if not cleaned_content.strip():
             print(f"[WARNING] No content found in {link}")
-            continue
+            return None
         
-        # Get previous content state
-        previous_state = load_previous_content(link)
-        previous_content = previous_state["content"]
-        
-        # Check for new content
-        new_content = get_content_diff(previous_content, cleaned_content)
+        # Check for new content, skipping the diff when the page is byte for byte what was stored
+        previous_content = previous_states[link]["content"]
+        content_hash = hash_content(cleaned_content)
+        entry = url_index.get(link) if url_index is not None else None
+        if previous_content and entry is not None and entry["content_hash"] == content_hash:
+            new_content = ""
+        else:
+            new_content = get_content_diff(previous_content, cleaned_content)
+        novelty = get_novelty_index(config, get_state_directory())
+        if novelty is not None and new_content.strip():
+            # Lines another page or source already sent to the LLM are left out
+            new_content = novelty.new_lines(new_content)
         if not new_content.strip():
             print(f"[INFO] No new content in {link}")
-            continue
+            # Nothing new to analyse, but keep the validators so the next run can get a 304
+            save_current_content(link, cleaned_content, crawled.validators)
+            if url_index is not None:
+                url_index.record_fetch(link, content_hash)
+            return None
         
-        # Analyze new content
+        # Analyze new content; what exceeds the prompt budget is left for the next run
+        new_content, leftover = limit_analysis_content(new_content, link, config)
         print(f"[DEBUG] Analyzing content from {link}")
-        analysis = get_gpt4_analysis(new_content, link, keywords, category)
+        with llm_slots:
+            analysis = get_gpt4_analysis(new_content, link, keywords, category, config)
         if not analysis:
+            # Not recorded as fetched, so the page keeps its place in the next run's crawl order
             print(f"[WARNING] Analysis failed for {link}")
-            continue
+            return None
         
         # Save current state
-        save_current_content(link, cleaned_content)
-        
-        # Add to results
-        result["subpages"].append({
+        if novelty is not None:
+            novelty.record(new_content)
+        save_current_content(link, cleaned_content, crawled.validators, unprocessed=leftover)
+        if url_index is not None:
+            if leftover:
+                url_index.mark_unfinished(link)
+            else:
+                url_index.record_fetch(link, content_hash)
+        print(f"[INFO] Successfully processed {link}")
+        return {
             "url": link,
             "analysis": analysis
-        })
-        print(f"[INFO] Successfully processed {link}")
+        }
+    
+    # Step 6: Crawl and process the selected links in parallel
+    crawler = FrontierCrawler(fetch, select_links, process, **crawler_options)
+    start, pages = crawler.crawl(base_url)
+    if start.error:
+        result["error"] = f"Failed to fetch main page: {start.error}"
+        return result
     
+    skipped = [crawled.url for crawled in pages if crawled.skipped]
+    if skipped:
+        print(f"[INFO] Crawl budget used up, skipped {len(skipped)} links:")
+        for link in skipped:
+            print(f"  - {link}")
+    result["subpages"] = [crawled.result for crawled in pages if crawled.result]
+    print(f"[INFO] Processed {len(pages) - len(skipped)} subpages of {base_url}")
     return result
 
-def get_website_content(url):
-    """Fetch content from a URL with proper error handling."""
+def get_website_content(url, previous_state=None):
+    """Fetch content from a URL with proper error handling, returning (html, error, validators)."""
     try:
         headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
         }
-        response = requests.get(url, headers=headers, timeout=10)
+        headers.update(get_conditional_headers(previous_state))
+        response = get_fetch_client().get(url, headers=headers, timeout=10)
+        if response.status_code == 304:
+            return None, NOT_MODIFIED, get_validators(response)
         response.raise_for_status()
-        return response.text, None
+        return response.text, None, get_validators(response)
     except Exception as e:
-        return None, str(e)
+        return None, str(e), {}
 
-def generate_html_report(results, timestamp):
-    """Generate HTML report for deep crawl results."""
-    html_template = """
+# Stands in for the content while the report template is split into head and tail
+_CONTENT_MARKER = "\x00content\x00"
+
+# Report templates, defined once at module level
+REPORT_TEMPLATE = """
     <!DOCTYPE html>
     <html lang="de">
     <head>
@@ -202,36 +241,51 @@ def generate_html_report(results, timestamp):
     </body>
     </html>
     """
-    
-    content_html = ""
-    for result in results:
-        if result["error"]:
-            continue
-            
-        category = result["category"]
-        base_url = result["url"]
-        
-        # Get category styling
-        config = load_config()
-        category_config = config.get("categories", {}).get(category, {})
-        icon = category_config.get("icon", "bi-globe")
-        color = category_config.get("color", "primary")
-        
-        content_html += f"""
+
+# The part of a source card that only depends on the category
+CARD_HEADER_TEMPLATE = """
         <div class="card mb-4">
             <div class="card-header bg-{color} text-white">
                 <i class="bi {icon}"></i> {category}
+            </div>"""
+
+CARD_CLOSE = """
+                </div>
             </div>
+        </div>
+        """
+
+def category_fragments(config):
+    """Per-category card headers, rendered once per category."""
+    return CategoryFragments(config, 'bi-globe', 'primary', card_header=CARD_HEADER_TEMPLATE)
+
+def report_frame(timestamp):
+    """Return (head, tail) of the deep crawl report: everything before and after the source cards."""
+    date_str = datetime.fromtimestamp(timestamp).strftime('%d.%m.%Y %H:%M')
+    head, tail = REPORT_TEMPLATE.format(date=date_str, content=_CONTENT_MARKER).split(_CONTENT_MARKER)
+    return head, tail
+
+def render_source_card(result, fragments):
+    """HTML of one source and its analysed subpages; empty for sources that failed."""
+    if result["error"]:
+        return ""
+    
+    base_url = result["url"]
+    accordion_id = hash(base_url)
+    # Card and subpage markup stay f-strings: they are compiled with the module and
+    # format faster than any template; only the category header is cached
+    parts = [
+        fragments.render('card_header', result["category"]),
+        f"""
             <div class="card-body">
                 <h5 class="card-title">Updates von: <a href="{base_url}" target="_blank">{base_url}</a></h5>
-                <div class="accordion" id="accordion_{hash(base_url)}">
+                <div class="accordion" id="accordion_{accordion_id}">
         """
-        
-        for idx, subpage in enumerate(result["subpages"]):
-            subpage_url = subpage["url"]
-            analysis = subpage["analysis"]
-            
-            content_html += f"""
+    ]
+    for idx, subpage in enumerate(result["subpages"]):
+        subpage_url = subpage["url"]
+        analysis = subpage["analysis"]
+        parts.append(f"""
                     <div class="accordion-item">
                         <h2 class="accordion-header">
                             <button class="accordion-button {'collapsed' if idx > 0 else ''}" type="button" 
@@ -241,22 +295,45 @@ def generate_html_report(results, timestamp):
                         </h2>
                         <div id="collapse_{hash(subpage_url)}" 
                              class="accordion-collapse collapse {'show' if idx == 0 else ''}"
-                             data-bs-parent="#accordion_{hash(base_url)}">
+                             data-bs-parent="#accordion_{accordion_id}">
                             <div class="accordion-body">
                                 {analysis}
                             </div>
                         </div>
                     </div>
-            """
-        
-        content_html += """
-                </div>
-            </div>
-        </div>
-        """
-    
-    date_str = datetime.fromtimestamp(timestamp).strftime('%d.%m.%Y %H:%M')
-    return html_template.format(date=date_str, content=content_html)
+            """)
+    parts.append(CARD_CLOSE)
+    return "".join(parts)
+
+def generate_html_report(results, timestamp, config):
+    """Generate HTML report for deep crawl results."""
+    fragments = category_fragments(config)
+    head, tail = report_frame(timestamp)
+    return head + "".join(render_source_card(result, fragments) for result in results) + tail
+
+class StreamingDeepReport:
+    """
+    generate_html_report written while the crawl is going, one source card at a time.
+    The finished file is identical to generate_html_report's output.
+    """
+
+    def __init__(self, path, news_sources, timestamp, config):
+        self._fragments = category_fragments(config)
+        head, tail = report_frame(timestamp)
+        self._writer = StreamingReportWriter(path, head, tail)
+        self._results = OrderedResults(range(len(news_sources)), self._write_result)
+
+    def add(self, index, result):
+        """index: position of the result's source in news_sources"""
+        self._results.add(index, result)
+
+    def _write_result(self, result):
+        card = render_source_card(result, self._fragments)
+        if card:
+            self._writer.write(card)
+
+    def close(self):
+        self._writer.close()
 
 def main():
     # Parse command line arguments
@@ -267,32 +344,87 @@ def main():
     parser.add_argument('--max-pages', '-m',
                       help='Maximum number of subpages to process per source (default: 5)',
                       type=int, default=5)
+    parser.add_argument('--max-depth', '-d',
+                      help='How many link levels below each source page to follow (default: 1)',
+                      type=int, default=1)
+    parser.add_argument('--time-budget',
+                      help='Seconds per source after which no new page is fetched (default: no limit)',
+                      type=float, default=None)
+    parser.add_argument('--byte-budget',
+                      help='Bytes downloaded per source after which no new page is fetched (default: no limit)',
+                      type=int, default=None)
+    parser.add_argument('--max-fetches',
+                      help='Maximum concurrent page fetches per source (default: 8)',
+                      type=int, default=8)
+    parser.add_argument('--per-host',
+                      help='Maximum concurrent fetches per host (default: 2)',
+                      type=int, default=2)
+    parser.add_argument('--max-llm-calls',
+                      help='Maximum concurrent LLM requests (default: 4)',
+                      type=int, default=4)
+    parser.add_argument('--revisit-after',
+                      help='Hours before an already fetched subpage is due again; until then it is crawled after all others (default: url_index.revisit_after_hours from config, else 24)',
+                      type=float, default=None)
+    parser.add_argument('--pool-size',
+                      help='Maximum keep-alive connections per host (default: 10)',
+                      type=int, default=10)
+    parser.add_argument('--html-backend',
+                      help='HTML text extractor: stream, bs4, lxml or selectolax (default: html_backend from config, else stream)',
+                      choices=['stream', 'bs4', 'lxml', 'selectolax'])
+    parser.add_argument('--no-llm-cache',
+                      help='Always call the LLM instead of reusing cached answers',
+                      action='store_true')
     args = parser.parse_args()
+    configure_fetch_client(pool_size=args.pool_size)
+    set_llm_cache_bypass(args.no_llm_cache)
     
     print("[DEBUG] Starting main function")
     timestamp = time.time()
-    results = []
     
     # Load config from specified file
-    config = load_config(args.config)
+    config = get_config(args.config)
+    set_html_backend(args.html_backend or config.get('html_backend', 'stream'))
+    set_state_backend(config.get('state_backend', 'sqlite'))
     news_sources = config.get('news_sources', [])
     output_prefix = config.get('output_prefix', 'tech_news')
     
-    for i, source in enumerate(news_sources, 1):
-        print(f"\n[DEBUG] Processing source {i} of {len(news_sources)}")
-        result = process_source_deep(source, args.max_pages)
-        results.append(result)
-    
-    # Generate HTML report
-    print("\n[DEBUG] Generating HTML report")
-    html_content = generate_html_report(results, timestamp)
+    # Parsed pages are kept for the whole crawl, so no page is fetched or parsed twice
+    page_cache = {}
+    llm_slots = threading.BoundedSemaphore(max(1, args.max_llm_calls))
+    crawler_options = {
+        "max_depth": args.max_depth,
+        "max_pages": args.max_pages,
+        "time_budget": args.time_budget,
+        "byte_budget": args.byte_budget,
+        "max_fetches": args.max_fetches,
+        "per_host": args.per_host
+    }
+    url_index = open_url_index(config, get_state_directory())
+    revisit_after_hours = args.revisit_after
+    if revisit_after_hours is None:
+        revisit_after_hours = config.get('url_index', {}).get('revisit_after_hours', DEFAULT_REVISIT_AFTER_HOURS)
     
-    # Save HTML report using configured prefix
+    # The report is written source by source and can be opened at any time
     report_filename = os.path.abspath(f"{output_prefix}_{int(timestamp)}.html")
-    with open(report_filename, "w", encoding="utf-8") as f:
-        f.write(html_content)
+    report = StreamingDeepReport(report_filename, news_sources, timestamp, config)
+    print(f"[INFO] Writing report to {report_filename} as sources finish")
+    archive = open_results_archive(config, get_state_directory())
+    run_id = archive.start_run('deep', timestamp, config, report_filename) if archive is not None else None
+    for i, source in enumerate(news_sources, 1):
+        print(f"\n[DEBUG] Processing source {i} of {len(news_sources)}")
+        result = process_source_deep(source, config, page_cache, llm_slots, url_index,
+                                     revisit_after_hours, **crawler_options)
+        report.add(i - 1, result)
+        if archive is not None:
+            archive.record(run_id, i - 1, result)
+    if url_index is not None:
+        url_index.close()
+    if archive is not None:
+        archive.close()
+    report.close()
     
     print(f"[DEBUG] Report saved as {report_filename}")
+    get_fetch_client().print_stats()
     
     # Open the HTML file in the default browser
     print("[DEBUG] Opening report in default browser")
@@ -2,19 +2,38 @@ import os
 import time
 import json
 import argparse
+from collections import Counter
 from datetime import datetime
 from Lib.pdf_audio_tools import (
-    get_website_content,
+    get_website_content_conditional,
+    NOT_MODIFIED,
     clean_html,
+    set_html_backend,
+    set_state_backend,
     get_gpt4_analysis,
+    get_gpt4_analysis_batch,
+    limit_analysis_content,
     load_previous_content,
     save_current_content,
     get_content_diff,
-    call_gpt,
-    load_config
+    get_state_directory,
+    get_config
 )
+from Lib.source_pipeline import add_pipeline_arguments, pipeline_from_args
+from Lib.http_session import configure_fetch_client, get_fetch_client
+from Lib.llm_cache import set_llm_cache_bypass
+from Lib.novelty import get_novelty_index
+from Lib.report_writer import StreamingReportWriter, OrderedResults
+from Lib.report_templates import CategoryFragments
+from Lib.results_archive import open_results_archive
 
-def process_source(source):
+def process_source(source, config, pipeline, defer_analysis=False):
+    """
+    Fetch, diff and analyse one source.
+    With defer_analysis the new content is left in result["pending_content"]
+    for a batch analysis after all sources are processed, and the state to save
+    once it succeeded in result["pending_state"].
+    """
     url = source["url"]
     keywords = source["keywords"]
     category = source["category"]
@@ -32,25 +51,47 @@ def process_source(source):
         previous_state = load_previous_content(url)
         previous_content = previous_state["content"]
         
-        html_content, error = get_website_content(url)
-        if html_content:
+        with pipeline.fetch_slot(url):
+            html_content, error, validators = get_website_content_conditional(url, previous_state)
+        if error == NOT_MODIFIED:
+            # Unchanged since the stored state, so there is nothing to clean, diff or analyse
+            result["error"] = "No new content found"
+        elif html_content:
             print(f"[DEBUG] Content fetched for {url}, cleaning HTML")
             cleaned_content = clean_html(html_content)
             
             new_content = get_content_diff(previous_content, cleaned_content)
+            novelty = get_novelty_index(config, get_state_directory())
+            if novelty is not None and new_content.strip():
+                # Lines another source (or an earlier run) already sent to the LLM are left out
+                new_content = novelty.new_lines(new_content)
             
+            leftover = ""
             if new_content.strip():  # Check if there's any non-whitespace content
-                print(f"[DEBUG] New content found, starting analysis")
-                analysis = get_gpt4_analysis(new_content, url, keywords, category)
-                if analysis:
-                    print(f"[DEBUG] Analysis completed for {url}")
-                    result["analysis"] = analysis
+                new_content, leftover = limit_analysis_content(new_content, url, config)
+                if defer_analysis:
+                    print(f"[DEBUG] New content found, queued for batch analysis")
+                    result["pending_content"] = new_content
+                    result["pending_state"] = (cleaned_content, validators, leftover)
+                    # Until the batch has answered, the queued lines count as new and no 304 may hide them
+                    save_current_content(url, cleaned_content, unprocessed="\n".join(
+                        part for part in (new_content, leftover) if part))
+                    return result
                 else:
-                    result["error"] = "Failed to generate analysis"
+                    print(f"[DEBUG] New content found, starting analysis")
+                    with pipeline.llm_slot():
+                        analysis = get_gpt4_analysis(new_content, url, keywords, category, config)
+                    if analysis:
+                        print(f"[DEBUG] Analysis completed for {url}")
+                        result["analysis"] = analysis
+                        if novelty is not None:
+                            novelty.record(new_content)
+                    else:
+                        result["error"] = "Failed to generate analysis"
             else:
                 result["error"] = "No new content found"
             
-            save_current_content(url, cleaned_content)
+            save_current_content(url, cleaned_content, validators, unprocessed=leftover)
         else:
             result["error"] = error or "Failed to fetch content"
     except Exception as e:
@@ -59,8 +100,11 @@ def process_source(source):
     
     return result
 
-def generate_html_report(results, timestamp):
-    html_template = """
+# Stands in for the content while the report template is split into head and tail
+_CONTENT_MARKER = "\x00content\x00"
+
+# Report templates: module constants, formatted through bound methods that are looked up once
+REPORT_TEMPLATE = """
 <!DOCTYPE html>
 <html lang="de">
 <head>
@@ -120,39 +164,13 @@ def generate_html_report(results, timestamp):
 </html>
 """
 
-    config = load_config()
-    categories = config.get('categories', {})
-
-    # Group results by category
-    categorized_results = {}
-    for result in results:
-        category = result["category"]
-        if category not in categorized_results:
-            categorized_results[category] = []
-        categorized_results[category].append(result)
-
-    # Generate navigation
-    nav_items = []
-    for category in sorted(categorized_results.keys()):
-        category_config = categories.get(category, {})
-        icon = category_config.get('icon', 'bi-bookmark')
-        nav_items.append(
-            '<a class="flex-sm-fill text-sm-center nav-link" href="#{0}">'
-            '<i class="bi {1}"></i> {0}'
-            '</a>'.format(category, icon)
-        )
-    category_nav = "\n".join(nav_items)
+NAV_ITEM_TEMPLATE = (
+    '<a class="flex-sm-fill text-sm-center nav-link" href="#{category}">'
+    '<i class="bi {icon}"></i> {category}'
+    '</a>'
+)
 
-    # Generate content
-    content_sections = []
-    for category in sorted(categorized_results.keys()):
-        items = categorized_results[category]
-        category_content = []
-        category_config = categories.get(category, {})
-        icon = category_config.get('icon', 'bi-bookmark')
-        color = category_config.get('color', 'secondary')
-        
-        section_template = """
+SECTION_TEMPLATE = """
             <section id="{0}" class="category-section">
                 <div class="category-header">
                     <h2>
@@ -165,15 +183,9 @@ def generate_html_report(results, timestamp):
                 </div>
                 <div class="row">
         """
-        category_content.append(section_template.format(
-            category,
-            icon,
-            color,
-            len(items)
-        ))
+_format_section = SECTION_TEMPLATE.format
 
-        for item in items:
-            news_template = """
+NEWS_TEMPLATE = """
                 <div class="col-12 news-card">
                     <div class="card">
                         <div class="card-body">
@@ -194,91 +206,196 @@ def generate_html_report(results, timestamp):
                     </div>
                 </div>
             """
-            
-            # Get domain name for display
-            domain = item['url'].split('//')[1].split('/')[0]
-            
-            # Format error message if present
-            error_html = ''
-            if item.get('error'):
-                error_html = f'<div class="error-text mt-3"><i class="bi bi-exclamation-triangle"></i> {item["error"]}</div>'
-            
-            category_content.append(news_template.format(
-                item['url'],
-                domain,
-                ', '.join(item['keywords']),
-                item.get('analysis', '').replace('\n', '<br>') if item.get('analysis') else '',
-                error_html
-            ))
+_format_news_item = NEWS_TEMPLATE.format
 
-        category_content.append("</div></section>")
-        content_sections.append("\n".join(category_content))
+def category_fragments(config):
+    """Per-category icon, colour and navigation link, looked up and rendered once per category."""
+    return CategoryFragments(config, 'bi-bookmark', 'secondary', nav_item=NAV_ITEM_TEMPLATE)
+
+def report_frame(report_categories, timestamp, fragments):
+    """
+    Return (head, tail) of the report: everything before and after the category sections.
+    report_categories: the categories that get a section, in report order
+    """
+    category_nav = "\n".join(fragments.render('nav_item', category) for category in report_categories)
 
-    content = "\n".join(content_sections)
-    
     current_time = datetime.fromtimestamp(timestamp)
     date = current_time.strftime("%d.%m.%Y")
     datetime_str = current_time.strftime("%d.%m.%Y %H:%M:%S")
 
-    return html_template.format(
+    document = REPORT_TEMPLATE.format(
         date=date,
         datetime=datetime_str,
         category_nav=category_nav,
-        content=content
+        content=_CONTENT_MARKER
     )
+    head, tail = document.split(_CONTENT_MARKER)
+    return head, tail
 
-def get_gpt4_analysis(content, url, keywords, category):
-    print(f"[DEBUG] Starting GPT-4 analysis for {url} in category {category}")
-    keywords_str = ", ".join(keywords)
-    
-    # Get system message from config
-    config = load_config()
-    categories = config.get('categories', {})
-    category_config = categories.get(category, {})
-    system_message = category_config.get('system_message', "You are an expert technology analyst.")
+def render_section_header(category, count, fragments):
+    """Opening of a category section; closed by "</div></section>" after its news items."""
+    icon, color = fragments.style(category)
+    return _format_section(category, icon, color, count)
+
+def render_news_item(item):
+    # Get domain name for display
+    domain = item['url'].split('//')[1].split('/')[0]
     
-    user_message = """Please analyze the following new content from {0} and provide a summary of the latest developments related to {1}, 
-    focusing on these keywords: {2}. Highlight the most important updates and their practical implications for developers.
-    Provide the summary in German.
+    # Format error message if present
+    error_html = ''
+    if item.get('error'):
+        error_html = f'<div class="error-text mt-3"><i class="bi bi-exclamation-triangle"></i> {item["error"]}</div>'
     
-    Content to analyze:
-    {3}
-    """.format(url, category, keywords_str, content)
+    analysis = item.get('analysis')
+    return _format_news_item(
+        item['url'],
+        domain,
+        ', '.join(item['keywords']),
+        analysis.replace('\n', '<br>') if analysis else '',
+        error_html
+    )
+
+def generate_html_report(results, timestamp, config):
+    # Group results by category
+    categorized_results = {}
+    for result in results:
+        category = result["category"]
+        if category not in categorized_results:
+            categorized_results[category] = []
+        categorized_results[category].append(result)
+
+    # Generate content
+    fragments = category_fragments(config)
+    report_categories = sorted(categorized_results.keys())
+    content_sections = []
+    for category in report_categories:
+        items = categorized_results[category]
+        category_content = [render_section_header(category, len(items), fragments)]
+        category_content.extend(map(render_news_item, items))
+        category_content.append("</div></section>")
+        content_sections.append("\n".join(category_content))
 
-    return call_gpt(system_message, user_message)
+    head, tail = report_frame(report_categories, timestamp, fragments)
+    return head + "\n".join(content_sections) + tail
 
-def main():
+class StreamingNewsReport:
+    """
+    generate_html_report written while the run is going: each source's card is
+    written as soon as it and the sources before it in report order are done.
+    The finished file is identical to generate_html_report's output.
+    """
+
+    def __init__(self, path, news_sources, timestamp, config):
+        self._fragments = category_fragments(config)
+        # One result per source, so the categories and their sizes are known up front
+        self._counts = Counter(source["category"] for source in news_sources)
+        head, tail = report_frame(sorted(self._counts), timestamp, self._fragments)
+        self._writer = StreamingReportWriter(path, head, tail)
+        order = sorted(range(len(news_sources)), key=lambda i: (news_sources[i]["category"], i))
+        self._results = OrderedResults(order, self._write_result)
+        self._category = None
+
+    def add(self, index, result):
+        """index: position of the result's source in news_sources"""
+        self._results.add(index, result)
+
+    def _write_result(self, result):
+        category = result["category"]
+        html = "\n" + render_news_item(result)
+        if category != self._category:
+            html = render_section_header(category, self._counts[category], self._fragments) + html
+            if self._category is not None:
+                html = "\n</div></section>\n" + html
+            self._category = category
+        self._writer.write(html)
+
+    def close(self):
+        if self._category is not None:
+            self._writer.write("\n</div></section>")
+        self._writer.close()
+
+def main(argv=None):
     # Parse command line arguments
     parser = argparse.ArgumentParser(description='AI News Generator')
     parser.add_argument('--config', '-c', 
                       help='Path to config file (default: ai-news-config.json)',
                       default='ai-news-config.json')
-    args = parser.parse_args()
+    add_pipeline_arguments(parser)
+    parser.add_argument('--pool-size',
+                      help='Maximum keep-alive connections per host (default: 10)',
+                      type=int, default=10)
+    parser.add_argument('--html-backend',
+                      help='HTML text extractor: stream, bs4, lxml or selectolax (default: html_backend from config, else stream)',
+                      choices=['stream', 'bs4', 'lxml', 'selectolax'])
+    parser.add_argument('--batch',
+                      help='Send all analyses through the provider batch API at once (cheaper, may take hours)',
+                      action='store_true')
+    parser.add_argument('--no-llm-cache',
+                      help='Always call the LLM instead of reusing cached answers',
+                      action='store_true')
+    args = parser.parse_args(argv)
+    configure_fetch_client(pool_size=args.pool_size)
+    set_llm_cache_bypass(args.no_llm_cache)
     
     print("[DEBUG] Starting main function")
     timestamp = time.time()
-    results = []
     
     # Load config from specified file
-    config = load_config(args.config)
+    config = get_config(args.config)
+    set_html_backend(args.html_backend or config.get('html_backend', 'stream'))
+    set_state_backend(config.get('state_backend', 'sqlite'))
     news_sources = config.get('news_sources', [])
     output_prefix = config.get('output_prefix', 'tech_news')
     
-    for i, source in enumerate(news_sources, 1):
-        print(f"\n[DEBUG] Processing source {i} of {len(news_sources)}")
-        result = process_source(source)
-        results.append(result)
+    pipeline = pipeline_from_args(args)
     
-    # Generate HTML report
-    print("\n[DEBUG] Generating HTML report")
-    html_content = generate_html_report(results, timestamp)
-    
-    # Save HTML report using configured prefix
+    # The report is written while the sources are processed and can be opened at any time
     report_filename = os.path.abspath(f"{output_prefix}_{int(timestamp)}.html")
-    with open(report_filename, "w", encoding="utf-8") as f:
-        f.write(html_content)
+    report = StreamingNewsReport(report_filename, news_sources, timestamp, config)
+    print(f"[INFO] Writing report to {report_filename} as sources finish")
+    archive = open_results_archive(config, get_state_directory())
+    run_id = archive.start_run('news', timestamp, config, report_filename) if archive is not None else None
+
+    def add_result(index, result):
+        report.add(index, result)
+        if archive is not None:
+            archive.record(run_id, index, result)
+
+    def run_source(numbered_source):
+        i, source = numbered_source
+        print(f"\n[DEBUG] Processing source {i} of {len(news_sources)}")
+        return process_source(source, config, pipeline, defer_analysis=args.batch)
+
+    if args.batch:
+        # Results come back in config order, so the report stays deterministic
+        results = pipeline.run(enumerate(news_sources, 1), run_source)
+        pending = [result for result in results if "pending_content" in result]
+        print(f"\n[DEBUG] Analysing {len(pending)} sources through the batch API")
+        jobs = [
+            (result.pop("pending_content"), result["url"], result["keywords"], result["category"])
+            for result in pending
+        ]
+        novelty = get_novelty_index(config, get_state_directory())
+        for result, job, analysis in zip(pending, jobs, get_gpt4_analysis_batch(jobs, config)):
+            cleaned_content, validators, leftover = result.pop("pending_state")
+            if analysis:
+                result["analysis"] = analysis
+                if novelty is not None:
+                    novelty.record(job[0])
+                save_current_content(result["url"], cleaned_content, validators, unprocessed=leftover)
+            else:
+                result["error"] = "Failed to generate analysis"
+        for index, result in enumerate(results):
+            add_result(index, result)
+    else:
+        # Each result goes to the report and the archive as it finishes; the report puts them in order
+        pipeline.run(enumerate(news_sources, 1), run_source, on_result=add_result)
+    report.close()
+    if archive is not None:
+        archive.close()
     
     print(f"[DEBUG] Report saved as {report_filename}")
+    get_fetch_client().print_stats()
     
     # Open the HTML file in the default browser
     print("[DEBUG] Opening report in default browser")
@@ -0,0 +1,408 @@
+import os
+import sys
+import time
+import argparse
+import statistics
+import subprocess
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+def entry_point_imports():
+    """
+    Names each root script imports from Lib.pdf_audio_tools, read from its import statements.
+    Returns:
+        dict: script filename -> list of names, for the scripts that import any
+    """
+    import ast
+    imports = {}
+    for filename in sorted(os.listdir(BASE_DIR)):
+        if not filename.endswith('.py') or filename == os.path.basename(__file__):
+            continue
+        with open(os.path.join(BASE_DIR, filename), 'r', encoding='utf-8') as f:
+            tree = ast.parse(f.read(), filename)
+        names = [
+            alias.name
+            for node in ast.walk(tree)
+            if isinstance(node, ast.ImportFrom) and node.module == 'Lib.pdf_audio_tools'
+            for alias in node.names
+        ]
+        if names:
+            imports[filename] = names
+    return imports
+
+# What importing the old single-file module cost: every submodule plus both API clients
+EAGER_IMPORT = (
+    "import Lib.pdf_audio_tools.fetch, Lib.pdf_audio_tools.html, Lib.pdf_audio_tools.llm, "
+    "Lib.pdf_audio_tools.tts, Lib.pdf_audio_tools.audio, Lib.pdf_audio_tools.pdf, Lib.pdf_audio_tools.state; "
+    "import openai, anthropic; "
+    "Lib.pdf_audio_tools.get_openai_client(); Lib.pdf_audio_tools.get_anthropic_client()"
+)
+
+
+def time_import(statement, repeat):
+    """Median wall time of `statement` in a fresh interpreter, in milliseconds."""
+    code = (
+        "import time; t = time.perf_counter(); "
+        + statement
+        + "; print((time.perf_counter() - t) * 1000)"
+    )
+    # Creating the API clients only needs a key to be set, not a valid one
+    env = dict(os.environ)
+    env.setdefault("OPENAI_API_KEY", "benchmark")
+    env.setdefault("ANTHROPIC_API_KEY", "benchmark")
+    samples = []
+    for _ in range(repeat):
+        output = subprocess.run(
+            [sys.executable, "-c", code], cwd=BASE_DIR, env=env,
+            capture_output=True, text=True, check=True
+        ).stdout
+        samples.append(float(output.strip().splitlines()[-1]))
+    return statistics.median(samples)
+
+
+def benchmark_imports(args):
+    eager = time_import(EAGER_IMPORT, args.repeat)
+    print(f"{'entry point':<26}{'lazy ms':>10}{'eager ms':>10}{'saved':>8}")
+    for entry_point, names in entry_point_imports().items():
+        statement = f"from Lib.pdf_audio_tools import {', '.join(names)}"
+        lazy = time_import(statement, args.repeat)
+        print(f"{entry_point:<26}{lazy:>10.1f}{eager:>10.1f}{(1 - lazy / eager) * 100:>7.0f}%")
+
+
+def benchmark_clean_html(args):
+    from Lib.pdf_audio_tools.html import EXTRACTORS, extract_text
+
+    pages = {}
+    for filename in sorted(os.listdir(args.corpus)):
+        if filename.lower().endswith(('.html', '.htm')):
+            with open(os.path.join(args.corpus, filename), 'r', encoding='utf-8', errors='replace') as f:
+                pages[filename] = f.read()
+    if not pages:
+        print(f"[ERROR] No .html files found in {args.corpus}")
+        return
+    total_bytes = sum(len(page) for page in pages.values())
+    print(f"[INFO] {len(pages)} pages, {total_bytes / 1e6:.1f} MB")
+
+    # Today's clean_html output is the reference every backend has to match line for line
+    reference = {name: extract_text(page, 'bs4') for name, page in pages.items()}
+    print(f"{'backend':<12}{'seconds':>10}{'MB/s':>8}{'speedup':>9}  parity")
+    baseline = None
+    for backend in ['bs4'] + [name for name in EXTRACTORS if name != 'bs4']:
+        try:
+            outputs = {name: extract_text(page, backend) for name, page in pages.items()}
+        except ImportError as e:
+            print(f"{backend:<12}  skipped ({e})")
+            continue
+        samples = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            for page in pages.values():
+                extract_text(page, backend)
+            samples.append(time.perf_counter() - start)
+        seconds = min(samples)
+        if backend == 'bs4':
+            baseline = seconds
+        mismatches = [name for name, text in outputs.items() if text != reference[name]]
+        parity = "identical" if not mismatches else f"{len(mismatches)} differ: {', '.join(mismatches[:3])}"
+        speedup = f"{baseline / seconds:.1f}x" if baseline else "-"
+        print(f"{backend:<12}{seconds:>10.3f}{total_bytes / 1e6 / seconds:>8.1f}{speedup:>9}  {parity}")
+
+
+# Pieces of the generated URL corpus for the matcher parity check: every excluded
+# pattern and keyword shows up in mixed case, inside words and next to regex metacharacters
+URL_HOSTS = ['https://www.heise.de', 'http://example.com:8080', 'https://news.ycombinator.com', 'https://t3n.de']
+URL_WORDS = ['ki', 'KI-News', 'artikel', 'ChatGPT', 'openai', 'c++', '.net', 'a.i', '(beta)', 'straße',
+             'İstanbul', 'Team-Building', 'SupportVector', 'rssi', 'startup', 'Machine-Learning', '']
+MATCHER_KEYWORDS = [
+    [],
+    ['ki', 'ai', 'llm'],
+    ['KI', 'Künstliche Intelligenz', 'ChatGPT'],
+    ['c++', '.net', 'a.i', '(beta)', '[x]', '*'],
+    ['İ', 'STRASSE', 'straße'],
+    [''],
+]
+
+
+def generate_matcher_corpus(count, seed=1):
+    import random
+    from Lib.link_filter import EXCLUDED_PATTERNS
+    rng = random.Random(seed)
+    words = URL_WORDS + EXCLUDED_PATTERNS + [p.upper() for p in EXCLUDED_PATTERNS]
+    urls = []
+    for _ in range(count):
+        parts = [rng.choice(words) for _ in range(rng.randint(1, 4))]
+        separator = rng.choice(['/', '-', '_', '', '?q='])
+        urls.append(f"{rng.choice(URL_HOSTS)}/{separator.join(parts)}")
+    return urls
+
+
+def naive_is_excluded(url, excluded_patterns):
+    url_lower = url.lower()
+    return any(pattern in url_lower for pattern in excluded_patterns)
+
+
+def naive_is_relevant(url, keywords, excluded_patterns):
+    if naive_is_excluded(url, excluded_patterns):
+        return False
+    url_lower = url.lower()
+    return any(keyword.lower() in url_lower for keyword in keywords)
+
+
+def benchmark_matcher(args):
+    from Lib.link_filter import EXCLUDED_PATTERNS, LinkMatcher
+
+    if args.urls:
+        with open(args.urls, 'r', encoding='utf-8') as f:
+            urls = [line.strip() for line in f if line.strip()]
+    else:
+        urls = generate_matcher_corpus(args.count)
+    print(f"[INFO] {len(urls)} URLs, {len(MATCHER_KEYWORDS)} keyword sets")
+
+    # Parity: the compiled matcher has to agree with the original any(... in ...) loops on every URL
+    mismatches = 0
+    for keywords in MATCHER_KEYWORDS:
+        matcher = LinkMatcher(keywords)
+        valid, relevant = matcher.filter_links(urls)
+        expected_valid = [url for url in urls if not naive_is_excluded(url, EXCLUDED_PATTERNS)]
+        expected_relevant = [url for url in urls if naive_is_relevant(url, keywords, EXCLUDED_PATTERNS)]
+        for url in urls:
+            if (matcher.is_excluded(url) != naive_is_excluded(url, EXCLUDED_PATTERNS)
+                    or matcher.is_relevant(url) != naive_is_relevant(url, keywords, EXCLUDED_PATTERNS)):
+                mismatches += 1
+                if mismatches <= 5:
+                    print(f"[ERROR] Mismatch for keywords {keywords!r}: {url}")
+        if valid != expected_valid or relevant != expected_relevant:
+            mismatches += 1
+            print(f"[ERROR] filter_links differs for keywords {keywords!r}")
+    print(f"[INFO] Parity: {'identical' if not mismatches else f'{mismatches} mismatches'}")
+
+    keywords = MATCHER_KEYWORDS[2]
+    samples = {'naive': [], 'compiled': []}
+    for _ in range(args.repeat):
+        start = time.perf_counter()
+        [url for url in urls if not naive_is_excluded(url, EXCLUDED_PATTERNS)]
+        [url for url in urls if naive_is_relevant(url, keywords, EXCLUDED_PATTERNS)]
+        samples['naive'].append(time.perf_counter() - start)
+        start = time.perf_counter()
+        LinkMatcher(keywords).filter_links(urls)
+        samples['compiled'].append(time.perf_counter() - start)
+    naive, compiled = min(samples['naive']), min(samples['compiled'])
+    print(f"{'matcher':<12}{'seconds':>10}{'URLs/s':>12}")
+    print(f"{'naive':<12}{naive:>10.3f}{len(urls) / naive:>12.0f}")
+    print(f"{'compiled':<12}{compiled:>10.3f}{len(urls) / compiled:>12.0f}  {naive / compiled:.1f}x")
+
+
+def load_script(filename):
+    """Import one of the hyphenated root scripts as a module."""
+    import importlib.util
+    spec = importlib.util.spec_from_file_location(filename.replace('-', '_')[:-3], os.path.join(BASE_DIR, filename))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def generate_report_results(count, categories, seed=1):
+    """Synthetic ai-news results and deep crawl results, about a fifth of them with errors."""
+    import random
+    rng = random.Random(seed)
+    analysis = "\n".join(f"Absatz {i}: Neues Modell mit {i * 7} Milliarden Parametern veroeffentlicht." for i in range(6))
+    news_results, deep_results = [], []
+    for i in range(count):
+        source = {
+            "url": f"https://news{i % 97}.example.com/ai/artikel-{i}",
+            "keywords": ["KI", "LLM", f"Thema {i % 13}"],
+            "category": categories[i % len(categories)]
+        }
+        failed = rng.random() < 0.2
+        news_results.append(dict(source, analysis=None if failed else analysis,
+                                 error="Failed to generate analysis" if failed else None))
+        deep_results.append(dict(source, error="Failed to fetch main page" if failed else None, subpages=[
+            {"url": f"{source['url']}/seite-{j}", "analysis": analysis} for j in range(3)
+        ]))
+    return news_results, deep_results
+
+
+def benchmark_report(args):
+    import tempfile
+    categories = [f"Kategorie {i}" for i in range(args.categories)]
+    config = {"categories": {name: {"icon": "bi-robot", "color": "primary"} for name in categories[::2]}}
+    news_results, deep_results = generate_report_results(args.items, categories)
+    timestamp = 1700000000
+
+    print(f"[INFO] {args.items} items in {args.categories} categories")
+    print(f"{'report':<28}{'seconds':>10}{'items/s':>10}{'MB':>8}")
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "report.html")
+        for filename, results, streaming_class in (
+                ('ai-news.py', news_results, 'StreamingNewsReport'),
+                ('ai-news-deep.py', deep_results, 'StreamingDeepReport')):
+            script = load_script(filename)
+
+            def render():
+                return script.generate_html_report(results, timestamp, config)
+
+            def stream():
+                report = getattr(script, streaming_class)(path, results, timestamp, config)
+                for index, result in enumerate(results):
+                    report.add(index, result)
+                report.close()
+
+            for label, func in ((f"{filename} generate", render), (f"{filename} streaming", stream)):
+                samples = []
+                for _ in range(args.repeat):
+                    start = time.perf_counter()
+                    output = func()
+                    samples.append(time.perf_counter() - start)
+                size = len(output) if output is not None else os.path.getsize(path)
+                seconds = min(samples)
+                print(f"{label:<28}{seconds:>10.3f}{args.items / seconds:>10.0f}{size / 1e6:>8.1f}")
+
+
+def generate_book(size, seed=1):
+    """Synthetic book text of about size characters: paragraphs of sentences with mixed whitespace."""
+    import random
+    rng = random.Random(seed)
+    words = ["der", "Fluss", "Engpass", "Durchsatz", "Bestand", "Regel", "Arbeit", "Zeit", "Wert",
+             "überall", "Straße", "Größe", "Produktionsplanungs­abteilungsleitung", "a", "I", "x" * 40]
+    paragraphs, total = [], 0
+    while total < size:
+        sentences = []
+        for _ in range(rng.randint(1, 12)):
+            sentence = " ".join(rng.choice(words) for _ in range(rng.randint(1, 30)))
+            sentences.append(sentence[0].upper() + sentence[1:] + rng.choice(".!?.;"))
+        paragraph = "".join(sentence + rng.choice([" ", " ", "  ", "\n", " \t"]) for sentence in sentences)
+        paragraphs.append(paragraph)
+        total += len(paragraph) + 2
+    return "\n\n".join(paragraphs)
+
+
+# The splitters as they were before Lib.text_split.pack_pieces, kept as the parity reference
+
+def naive_split_by_words(text, max_chunk_size):
+    chunks = []
+    current_chunk = ""
+    for word in text.split():
+        if len(current_chunk) + len(word) + 1 <= max_chunk_size:
+            current_chunk += word + " "
+        else:
+            chunks.append(current_chunk.strip())
+            current_chunk = word + " "
+    if current_chunk:
+        chunks.append(current_chunk.strip())
+    return chunks
+
+
+def naive_split_by_sentences(text, max_chunk_size):
+    import re
+    chunks = []
+    current_chunk = ""
+    for sentence in re.split(r'(?<=[.!?])\s+', text):
+        if len(current_chunk) + len(sentence) + 1 <= max_chunk_size:
+            current_chunk += sentence + " "
+        else:
+            chunks.append(current_chunk.strip())
+            current_chunk = sentence + " "
+    if current_chunk:
+        chunks.append(current_chunk.strip())
+    return chunks
+
+
+def naive_split_for_speech(text, max_chars):
+    chunks = []
+    current_chunk = ""
+    for word in text.split():
+        if len(current_chunk) + len(word) + 1 <= max_chars:
+            current_chunk += " " + word if current_chunk else word
+        else:
+            chunks.append(current_chunk)
+            current_chunk = word
+    if current_chunk:
+        chunks.append(current_chunk)
+    return chunks
+
+
+def benchmark_chunking(args):
+    from Lib import text_split
+    from Lib.pdf_audio_tools.tts import split_for_speech
+
+    if args.file:
+        text = text_split.read_text_file(args.file)
+    else:
+        text = generate_book(int(args.size * 1e6))
+    print(f"[INFO] {len(text) / 1e6:.1f}M characters")
+
+    splitters = [
+        ('words', naive_split_by_words, text_split.split_by_words),
+        ('sentences', naive_split_by_sentences, text_split.split_by_sentences),
+        ('speech', naive_split_for_speech, split_for_speech),
+    ]
+
+    # Parity: same chunks as the original splitters, including the edge cases of tiny chunk sizes and empty input
+    mismatches = 0
+    samples = [text[:20000], " " + text[:5000] + ". ", "", "   ", "Ende. ", text]
+    for name, naive, engine in splitters:
+        for sample in samples:
+            for size in (1, 2, 7, 80, args.chunk_size):
+                if naive(sample, size) != engine(sample, size):
+                    mismatches += 1
+                    print(f"[ERROR] {name} differs for a {len(sample)} character text at chunk size {size}")
+    print(f"[INFO] Parity: {'identical' if not mismatches else f'{mismatches} mismatches'}")
+
+    print(f"{'splitter':<12}{'naive s':>10}{'engine s':>10}{'MB/s':>8}{'chunks':>8}")
+    for name, naive, engine in splitters:
+        seconds = {}
+        for label, func in (('naive', naive), ('engine', engine)):
+            timings = []
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                chunks = func(text, args.chunk_size)
+                timings.append(time.perf_counter() - start)
+            seconds[label] = min(timings)
+        print(f"{name:<12}{seconds['naive']:>10.3f}{seconds['engine']:>10.3f}"
+              f"{len(text) / 1e6 / seconds['engine']:>8.1f}{len(chunks):>8}  {seconds['naive'] / seconds['engine']:.1f}x")
+    timings = []
+    for _ in range(args.repeat):
+        start = time.perf_counter()
+        chunks = text_split.split_by_paragraphs(text, args.chunk_size)
+        timings.append(time.perf_counter() - start)
+    print(f"{'paragraphs':<12}{'':>10}{min(timings):>10.3f}{len(text) / 1e6 / min(timings):>8.1f}{len(chunks):>8}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Micro-benchmarks for the Lib helpers')
+    subparsers = parser.add_subparsers(dest='benchmark', required=True)
+
+    imports_parser = subparsers.add_parser('imports', help='Cold import time of Lib.pdf_audio_tools per entry point')
+    imports_parser.add_argument('--repeat', type=int, default=5, help='Fresh interpreters per measurement (default: 5)')
+    imports_parser.set_defaults(func=benchmark_imports)
+
+    clean_html_parser = subparsers.add_parser('clean-html', help='clean_html backends against a corpus of saved pages')
+    clean_html_parser.add_argument('corpus', help='Directory with saved .html pages')
+    clean_html_parser.add_argument('--repeat', type=int, default=3, help='Timed passes per backend, best is reported (default: 3)')
+    clean_html_parser.set_defaults(func=benchmark_clean_html)
+
+    matcher_parser = subparsers.add_parser('matcher', help='Compiled link matcher against the original substring loops')
+    matcher_parser.add_argument('--urls', help='File with one URL per line (default: a generated corpus)')
+    matcher_parser.add_argument('--count', type=int, default=20000, help='Size of the generated corpus (default: 20000)')
+    matcher_parser.add_argument('--repeat', type=int, default=3, help='Timed passes, best is reported (default: 3)')
+    matcher_parser.set_defaults(func=benchmark_matcher)
+
+    report_parser = subparsers.add_parser('report', help='Render synthetic ai-news and deep crawl reports')
+    report_parser.add_argument('--items', type=int, default=10000, help='Number of sources in the report (default: 10000)')
+    report_parser.add_argument('--categories', type=int, default=12, help='Number of categories (default: 12)')
+    report_parser.add_argument('--repeat', type=int, default=3, help='Timed passes, best is reported (default: 3)')
+    report_parser.set_defaults(func=benchmark_report)
+
+    chunking_parser = subparsers.add_parser('chunking', help='Text splitters against the original string-building loops')
+    chunking_parser.add_argument('--file', help='Book as a UTF-8 text file (default: a generated book)')
+    chunking_parser.add_argument('--size', type=float, default=8, help='Size of the generated book in million characters (default: 8)')
+    chunking_parser.add_argument('--chunk-size', type=int, default=4000, help='Maximum chunk size (default: 4000)')
+    chunking_parser.add_argument('--repeat', type=int, default=3, help='Timed passes, best is reported (default: 3)')
+    chunking_parser.set_defaults(func=benchmark_chunking)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
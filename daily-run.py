@@ -1,45 +1,119 @@
-import subprocess
-import sys
+import os
+import argparse
 import datetime
+import importlib.util
+from Lib.scheduler import Scheduler, Job, CronTrigger, IntervalTrigger
+from Lib.pdf_audio_tools import play_audio, get_config
+from Lib.prefetch import Prefetcher
+from Lib.state_store import flush_state_stores
+from Lib.novelty import save_novelty_indexes
+from Lib.llm_cache import flush_llm_caches
+from random_pdf_reader import prepare_random_pdf, read_random_pdf
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Defaults of the options that can also be set in the config's schedule section
+SCHEDULE_DEFAULTS = {
+    'news_cron': '0 6 * * *',
+    'pdf_directory': './pdfs',
+    'num_pages': 20,
+    'reader_pause': 0,
+    'prefetch': 1,
+    'backoff': 30,
+    'max_backoff': 3600
+}
 
 def log(message):
     timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    print(f"[{timestamp}] {message}")
-
-def run_subprocess(command):
-    process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True, bufsize=1)
-    while True:
-        output = process.stdout.readline()
-        if output == '' and process.poll() is not None:
-            break
-        if output:
-            print(output.strip(), flush=True)
-    return process.poll()
-
-log("Starting daily-run.py")
-
-# Run ai-news.py once
-log("Attempting to run ai-news.py...")
-try:
-    return_code = run_subprocess(["python", "ai-news.py"])
-    log(f"ai-news.py completed with return code: {return_code}")
-except Exception as e:
-    log(f"Error running ai-news.py: {e}")
-
-# Loop random_pdf_reader with ./pdfs 20 as parameters
-log("Starting random_pdf_reader loop...")
-loop_count = 0
-while True:
+    print(f"[{timestamp}] {message}", flush=True)
+
+def load_script(filename):
+    """Import one of the hyphenated root scripts as a module."""
+    spec = importlib.util.spec_from_file_location(filename.replace('-', '_')[:-3], os.path.join(BASE_DIR, filename))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+def main():
+    parser = argparse.ArgumentParser(description='Runs the news report and the PDF reader in one long-running process')
+    parser.add_argument('--config', '-c',
+                      help='Config file for ai-news.py (default: ai-news-config.json)',
+                      default='ai-news-config.json')
+    parser.add_argument('--news-cron',
+                      help='When to generate the news report, as a cron expression (default: schedule.news_cron from config, else "0 6 * * *", daily at 06:00)')
+    parser.add_argument('--no-news-at-start',
+                      help="Don't generate the news report right after starting (default: schedule.news_at_start from config, else generate it)",
+                      action='store_true')
+    parser.add_argument('--pdf-directory',
+                      help='Directory the PDF reader picks its PDFs from (default: schedule.pdf_directory from config, else ./pdfs)')
+    parser.add_argument('--num-pages',
+                      help='Pages read aloud per PDF (default: schedule.num_pages from config, else 20)',
+                      type=int)
+    parser.add_argument('--reader-pause',
+                      help='Seconds between two PDFs (default: schedule.reader_pause from config, else 0)',
+                      type=int)
+    parser.add_argument('--prefetch',
+                      help='PDFs prepared in the background while one plays, 0 = prepare each when its turn comes (default: schedule.prefetch from config, else 1)',
+                      type=int)
+    parser.add_argument('--backoff',
+                      help='Seconds before a failed job is retried, doubled per failure in a row (default: schedule.backoff from config, else 30)',
+                      type=int)
+    parser.add_argument('--max-backoff',
+                      help='Longest wait before retrying a failed job (default: schedule.max_backoff from config, else 3600)',
+                      type=int)
+    args = parser.parse_args()
+
+    # Options not given on the command line come from the config's schedule section
+    schedule = get_config(args.config).get('schedule', {})
+    for name, default in SCHEDULE_DEFAULTS.items():
+        if getattr(args, name) is None:
+            setattr(args, name, schedule.get(name, default))
+    news_at_start = not args.no_news_at_start and schedule.get('news_at_start', True)
+
+    log("Starting daily-run.py")
+    ai_news = load_script('ai-news.py')
+
+    # Preparing starts right away, so the first PDF is ready by the time the news job is done
+    lessons = None
+    if args.prefetch > 0:
+        lessons = Prefetcher(lambda: prepare_random_pdf(args.pdf_directory, args.num_pages), depth=args.prefetch)
+
+    def run_news():
+        try:
+            ai_news.main(["--config", args.config])
+        finally:
+            # This process doesn't exit after a run, so what ai-news would write at exit is written now
+            flush_state_stores()
+            save_novelty_indexes()
+            flush_llm_caches()
+
+    def read_pdf():
+        if lessons is None:
+            played = read_random_pdf(args.pdf_directory, args.num_pages)
+        else:
+            audio_contents = lessons.get()
+            played = bool(audio_contents)
+            if played:
+                play_audio(audio_contents)
+        if not played:
+            raise RuntimeError("PDF could not be prepared or read aloud")
+
+    scheduler = Scheduler([
+        # A failing news run is retried a few times, then waits for its next scheduled time
+        Job("ai-news", run_news, CronTrigger(args.news_cron),
+            run_at_start=news_at_start, backoff_base=args.backoff,
+            backoff_max=args.max_backoff, max_retries=3),
+        Job("random_pdf_reader", read_pdf, IntervalTrigger(args.reader_pause),
+            backoff_base=args.backoff, backoff_max=args.max_backoff)
+    ], log=log)
     try:
-        loop_count += 1
-        log(f"Running random_pdf_reader (iteration {loop_count})...")
-        return_code = run_subprocess(["python", "random_pdf_reader.py", "./pdfs", "20"])
-        log(f"random_pdf_reader completed with return code: {return_code}")
+        scheduler.run_forever()
     except KeyboardInterrupt:
         log("Script terminated by user.")
-        break
-    except Exception as e:
-        log(f"Error running random_pdf_reader: {e}")
-        log("Continuing to next iteration...")
+    if lessons is not None:
+        lessons.close(timeout=0)
+    scheduler.print_metrics()
+    log("daily-run.py completed")
 
-log("daily-run.py completed")
+if __name__ == "__main__":
+    main()
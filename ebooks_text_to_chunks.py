@@ -1,4 +1,5 @@
 import os
+import time
 import argparse
 from Lib import text_split
 import shutil
@@ -8,28 +9,61 @@ def clear_output_directory(output_dir):
         shutil.rmtree(output_dir)
     os.makedirs(output_dir)
 
-def split_file(input_file, output_dir, max_chars=4000):
-    clear_output_directory(output_dir)
+def count_visible_characters(text):
+    """Number of printable or whitespace characters; each distinct character is only checked once."""
+    hidden = sum(text.count(c) for c in set(text) if not (c.isprintable() or c.isspace()))
+    return len(text) - hidden
+
+class ProgressReport:
+    """Prints how much of the input has been read, at most every interval seconds."""
+
+    def __init__(self, total_bytes, interval=2.0):
+        self.total_bytes = total_bytes
+        self.interval = interval
+        self.started = time.monotonic()
+        self._last = self.started
+        self._reported = None
 
-    file_content = text_split.read_text_file(input_file)
+    def __call__(self, bytes_read):
+        now = time.monotonic()
+        if bytes_read == self._reported or (now - self._last < self.interval and bytes_read < self.total_bytes):
+            return
+        self._last = now
+        self._reported = bytes_read
+        percent = 100 * bytes_read / self.total_bytes if self.total_bytes else 100
+        rate = bytes_read / 1e6 / max(now - self.started, 1e-9)
+        print(f"[INFO] {bytes_read / 1e6:.1f} of {self.total_bytes / 1e6:.1f} MB read ({percent:.0f}%, {rate:.1f} MB/s)")
+
+def split_file(input_file, output_dir, max_chars=4000, block_size=1 << 20):
+    """
+    Split input_file at sentence boundaries into part_NNN.txt files of at most max_chars characters.
+    The file is read block by block and every part is written as soon as it is complete,
+    so memory use doesn't grow with the size of the input.
+    """
+    clear_output_directory(output_dir)
 
-    chunks = text_split.split_by_sentences(file_content, max_chars)
+    sentences = text_split.iter_file_sentences(input_file, block_size,
+                                               progress=ProgressReport(os.path.getsize(input_file)))
+    chunks = text_split.join_piece_stream(sentences, max_chars)
 
+    count = 0
     for i, chunk in enumerate(chunks, start=1):
-        visible_char_count = sum(1 for c in chunk if c.isprintable() or c.isspace())
+        visible_char_count = count_visible_characters(chunk)
         print(f"Chunk {i}: {visible_char_count} visible characters")
         output_file = os.path.join(output_dir, f"part_{i:03d}.txt")
         with open(output_file, 'w', encoding='utf-8', newline='') as file:
             file.write(chunk)
+        count = i
 
-    print(f"Die Datei wurde in {len(chunks)} Teile aufgeteilt.")
+    print(f"Die Datei wurde in {count} Teile aufgeteilt.")
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Teilt eine Textdatei in kleinere Chunks auf.")
     parser.add_argument("input_file", help="Pfad zur Eingabedatei")
     parser.add_argument("output_dir", help="Pfad zum Ausgabeordner")
     parser.add_argument("-c", "--chunk_size", type=int, default=4000, help="Maximale Anzahl der Zeichen pro Chunk (Standard: 4000)")
+    parser.add_argument("--block_size", type=int, default=1 << 20, help="Gelesene Bytes pro Block (Standard: 1048576)")
 
     args = parser.parse_args()
 
-    split_file(args.input_file, args.output_dir, args.chunk_size)
\ No newline at end of file
+    split_file(args.input_file, args.output_dir, args.chunk_size, args.block_size)
@@ -4,6 +4,7 @@ import random
 import argparse
 from PyPDF2 import PdfReader
 from Lib.pdf_audio_tools import call_gpt, text_to_speech, play_audio, get_random_pdf, extract_text_from_pdf
+from Lib.prefetch import Prefetcher
 
 def prepare_content_with_gpt4(text, source_info):
     system_message = "Du bist ein erfahrener Lehrer/Trainer. Deine Aufgabe ist es, den gegebenen Text zu korrigieren, zu erklären und zusammenzufassen. Bitte sprich Deutsch."
@@ -11,7 +12,7 @@ def prepare_content_with_gpt4(text, source_info):
         f"Bitte erkläre den Inhalt, indem du ein kurzes Inhaltsverzeichnis erstellst, dann gehst du durch dieses Verzeichnis und erklärst die Details zu jedem Punkt. "
         f"Fasse am Ende nochmal zusammen, worum es ging. Beginne mit der Erwähnung der Quelle: {source_info}\n\nHier ist der Text:\n\n{text}"
     )
-    return call_gpt(system_message, user_message, model="gpt-4")
+    return call_gpt(system_message, user_message)
 
 def random_text_reader(text_dir, num_pages=3):
     # Get all text files in the directory
@@ -71,7 +72,12 @@ def random_pdf_reader(pdf_dir, num_pages=3):
         print(f"[ERROR] An unexpected error occurred in random_pdf_reader: {str(e)}")
         return None, None
 
-def random_educator(pdf_dir, text_dir, num_pages=3):
+def prepare_lesson(pdf_dir, text_dir, num_pages=3):
+    """
+    Turn random pages of a random PDF or text file into a spoken lesson.
+    Returns:
+        list: The lesson's audio chunks, or None if it could not be prepared
+    """
     # Randomly choose between PDF and text file
     is_pdf = random.choice([True, False])
 
@@ -82,19 +88,23 @@ def random_educator(pdf_dir, text_dir, num_pages=3):
         print("[INFO] Selected: Text file")
         selected_text, source_info = random_text_reader(text_dir, num_pages)
 
-    if selected_text and source_info:
-        # Process the text with GPT-4
-        processed_text = prepare_content_with_gpt4(selected_text, source_info)
-        print("[INFO] Processed text:")
-        print(processed_text)
+    if not (selected_text and source_info):
+        print("[ERROR] Failed to select and process text.")
+        return None
+
+    # Process the text with GPT-4
+    processed_text = prepare_content_with_gpt4(selected_text, source_info)
+    print("[INFO] Processed text:")
+    print(processed_text)
 
-        # Convert to speech
-        audio_file = text_to_speech(processed_text)
+    # Convert to speech
+    return text_to_speech(processed_text)
 
+def random_educator(pdf_dir, text_dir, num_pages=3):
+    audio_file = prepare_lesson(pdf_dir, text_dir, num_pages)
+    if audio_file is not None:
         # Play the audio
         play_audio(audio_file)
-    else:
-        print("[ERROR] Failed to select and process text.")
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Random Educator: Process and read random PDF or text files.")
@@ -102,15 +112,31 @@ if __name__ == "__main__":
     parser.add_argument("text_directory", help="Directory containing text files")
     parser.add_argument("--num_pages", type=int, default=3, help="Number of pages to read (default: 3)")
     parser.add_argument("--loop", type=int, help="Number of iterations (if not specified, runs indefinitely)")
+    parser.add_argument("--prefetch", type=int, default=0,
+                        help="Prepare the next N lessons in the background while one plays (default: 0)")
 
     args = parser.parse_args()
 
+    # The next lessons are prepared in the background while one plays
+    prefetcher = None
+    if args.prefetch > 0:
+        prefetcher = Prefetcher(lambda: prepare_lesson(args.pdf_directory, args.text_directory, args.num_pages),
+                                depth=args.prefetch)
+
     iteration = 1
     while True:
         print(f"\n[INFO] Iteration {iteration}")
-        random_educator(args.pdf_directory, args.text_directory, args.num_pages)
+        if prefetcher is None:
+            random_educator(args.pdf_directory, args.text_directory, args.num_pages)
+        else:
+            audio_file = prefetcher.get()
+            if audio_file is not None:
+                play_audio(audio_file)
         
         if args.loop and iteration >= args.loop:
             break
         
-        iteration += 1
\ No newline at end of file
+        iteration += 1
+
+    if prefetcher is not None:
+        prefetcher.close(timeout=0)
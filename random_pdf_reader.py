@@ -8,8 +8,11 @@ from Lib.pdf_audio_tools import (
     extract_text_from_pdf,
     call_gpt,
     text_to_speech,
-    play_audio
+    iter_speech,
+    play_audio,
+    play_audio_stream
 )
+from Lib.prefetch import Prefetcher
 
 def prepare_content_with_gpt4(text, pdf_path):
     print("[DEBUG] Preparing content with GPT-4")
@@ -25,33 +28,87 @@ Bearbeite den Text nach diesem Schema:
     user_message = f"Hier ist der Text aus der Quelle '{pdf_path}':\n\n{text}"
     return call_gpt(system_message, user_message)
 
-def random_pdf_reader(directory, num_pages=5, loop=False):
-    while True:
-        try:
-            pdf_path = get_random_pdf(directory)
-            print(f"[INFO] Selected PDF: {pdf_path}")
+def prepare_random_pdf_text(directory, num_pages=5):
+    """
+    Pick num_pages pages from a random position of a random PDF and turn them into a lesson text.
+    Returns:
+        str: The lesson, or None if it could not be prepared
+    """
+    pdf_path = get_random_pdf(directory)
+    print(f"[INFO] Selected PDF: {pdf_path}")
+
+    with open(pdf_path, 'rb') as file:
+        pdf_reader = PdfReader(file)
+        total_pages = len(pdf_reader.pages)
+
+    start_page = random.randint(0, max(0, total_pages - num_pages))
+    print(f"[INFO] Starting from page {start_page + 1}")
+
+    text = extract_text_from_pdf(pdf_path, start_page, num_pages)
+
+    prepared_content = prepare_content_with_gpt4(text, pdf_path)
+    if not prepared_content:
+        print("[ERROR] Failed to prepare content with GPT-4")
+        return None
+    print("[INFO] Content prepared successfully")
+    return prepared_content
+
+def prepare_random_pdf(directory, num_pages=5):
+    """
+    Like prepare_random_pdf_text, but also converts the lesson to speech.
+    Returns:
+        list: The lesson's audio chunks, or None if it could not be prepared
+    """
+    prepared_content = prepare_random_pdf_text(directory, num_pages)
+    if not prepared_content:
+        return None
 
-            with open(pdf_path, 'rb') as file:
-                pdf_reader = PdfReader(file)
-                total_pages = len(pdf_reader.pages)
+    audio_contents = text_to_speech(prepared_content)
+    if not audio_contents:
+        print("[ERROR] Failed to convert text to speech")
+        return None
+    print("[INFO] Text-to-speech conversion successful")
+    return audio_contents
 
-            start_page = random.randint(0, max(0, total_pages - num_pages))
-            print(f"[INFO] Starting from page {start_page + 1}")
+def read_random_pdf(directory, num_pages=5):
+    """
+    Read num_pages pages from a random position of a random PDF aloud.
+    Playback starts with the first converted chunk while the rest are still being converted.
+    Returns:
+        bool: Whether the pages were prepared and played
+    """
+    prepared_content = prepare_random_pdf_text(directory, num_pages)
+    if not prepared_content:
+        return False
 
-            text = extract_text_from_pdf(pdf_path, start_page, num_pages)
+    if not play_audio_stream(iter_speech(prepared_content)):
+        print("[ERROR] Failed to convert text to speech")
+        return False
+    return True
 
-            prepared_content = prepare_content_with_gpt4(text, pdf_path)
-            if prepared_content:
-                print("[INFO] Content prepared successfully")
-                
-                audio_contents = text_to_speech(prepared_content)
+def prefetching_pdf_reader(directory, num_pages=5, prefetch=1):
+    """
+    Loop mode with the next prefetch lessons prepared in the background,
+    so one starts playing as soon as the previous one ends.
+    """
+    with Prefetcher(lambda: prepare_random_pdf(directory, num_pages), depth=prefetch) as lessons:
+        while True:
+            try:
+                audio_contents = lessons.get()
                 if audio_contents:
-                    print("[INFO] Text-to-speech conversion successful")
                     play_audio(audio_contents)
-                else:
-                    print("[ERROR] Failed to convert text to speech")
-            else:
-                print("[ERROR] Failed to prepare content with GPT-4")
+            except Exception as e:
+                print(f"[ERROR] An unexpected error occurred: {str(e)}")
+                print("[INFO] Continuing to next PDF due to loop mode")
+
+def random_pdf_reader(directory, num_pages=5, loop=False, prefetch=0):
+    if loop and prefetch > 0:
+        prefetching_pdf_reader(directory, num_pages, prefetch)
+        return
+
+    while True:
+        try:
+            read_random_pdf(directory, num_pages)
 
             if not loop:
                 break
@@ -68,9 +125,11 @@ def main():
     parser.add_argument("pdf_directory", help="Directory containing PDF files")
     parser.add_argument("--num_pages", type=int, default=5, help="Number of pages to read (default: 5)")
     parser.add_argument("--loop", action="store_true", help="Continuously read random PDFs")
+    parser.add_argument("--prefetch", type=int, default=0,
+                        help="With --loop, prepare the next N PDFs in the background while one plays (default: 0)")
     args = parser.parse_args()
 
-    random_pdf_reader(args.pdf_directory, args.num_pages, args.loop)
+    random_pdf_reader(args.pdf_directory, args.num_pages, args.loop, args.prefetch)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -10,7 +10,7 @@ def prepare_content_with_gpt4(text):
         "Please explain and summarize the following text in German. "
         "Make it engaging and suitable for audio playback:\n\n" + text
     )
-    return call_gpt(system_message, user_message, model="gpt-4")
+    return call_gpt(system_message, user_message)
 
 def random_text_reader(text_dir, num_pages=3):
     # Get all text files in the directory
@@ -0,0 +1,288 @@
+"""
+Local stand-in for the OpenAI and Anthropic batch endpoints, for trying
+`ai-news.py --batch` without an account or waiting hours for a batch:
+
+    python -m tests.batch_stub_server --port 8765
+    set OPENAI_BASE_URL=http://127.0.0.1:8765/v1
+    set ANTHROPIC_BASE_URL=http://127.0.0.1:8765
+
+Batches finish after --polls status checks. Every request gets a canned
+answer, except those whose user message contains --fail-pattern.
+"""
+import argparse
+import itertools
+import json
+import re
+import threading
+import time
+from datetime import datetime, timezone
+from email import policy
+from email.parser import BytesParser
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+def _iso_now():
+    return datetime.now(timezone.utc).isoformat().replace('+00:00', 'Z')
+
+
+class BatchStubState:
+    """Files and batches held in memory by the stub server."""
+
+    def __init__(self, polls=1, fail_pattern=None):
+        self.polls = polls
+        self.fail_pattern = fail_pattern
+        self.files = {}    # id -> (filename, purpose, bytes)
+        self.batches = {}  # id -> dict with the provider's batch object plus bookkeeping
+        self._ids = itertools.count(1)
+        self.lock = threading.Lock()
+
+    def new_id(self, prefix):
+        return f"{prefix}_{next(self._ids):06d}"
+
+    def answer(self, custom_id, model, user_message):
+        """Canned answer for one request, or None if it should fail."""
+        if self.fail_pattern and self.fail_pattern in user_message:
+            return None
+        excerpt = " ".join(user_message.split())[-120:]
+        return f"Stub answer for {custom_id} from {model}: ...{excerpt}"
+
+
+class BatchStubHandler(BaseHTTPRequestHandler):
+    server_version = "BatchStub/1.0"
+
+    @property
+    def state(self):
+        return self.server.state
+
+    def log_message(self, format, *args):
+        print(f"[DEBUG] {self.address_string()} {format % args}")
+
+    def _send(self, status, body, content_type="application/json"):
+        data = body if isinstance(body, bytes) else json.dumps(body).encode('utf-8')
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _not_found(self):
+        self._send(404, {"error": {"type": "not_found_error", "message": f"No route for {self.path}"}})
+
+    def _read_body(self):
+        return self.rfile.read(int(self.headers.get("Content-Length") or 0))
+
+    def do_POST(self):
+        path = self.path.split('?')[0]
+        if path == "/v1/files":
+            return self._create_file()
+        if path == "/v1/batches":
+            return self._create_openai_batch()
+        if path == "/v1/messages/batches":
+            return self._create_anthropic_batch()
+        self._not_found()
+
+    def do_GET(self):
+        path = self.path.split('?')[0]
+        match = re.fullmatch(r"/v1/files/([\w-]+)/content", path)
+        if match:
+            return self._file_content(match.group(1))
+        match = re.fullmatch(r"/v1/batches/([\w-]+)", path)
+        if match:
+            return self._retrieve_openai_batch(match.group(1))
+        match = re.fullmatch(r"/v1/messages/batches/([\w-]+)", path)
+        if match:
+            return self._retrieve_anthropic_batch(match.group(1))
+        match = re.fullmatch(r"/v1/messages/batches/([\w-]+)/results", path)
+        if match:
+            return self._anthropic_results(match.group(1))
+        self._not_found()
+
+    # OpenAI: Files + Batches
+
+    def _create_file(self):
+        body = self._read_body()
+        message = BytesParser(policy=policy.default).parsebytes(
+            b"Content-Type: " + self.headers["Content-Type"].encode('latin-1') + b"\r\n\r\n" + body)
+        fields, filename, content = {}, "upload.jsonl", b""
+        for part in message.iter_parts():
+            name = part.get_param('name', header='content-disposition')
+            if part.get_filename():
+                filename, content = part.get_filename(), part.get_payload(decode=True)
+            else:
+                fields[name] = part.get_content().strip()
+        with self.state.lock:
+            file_id = self.state.new_id("file")
+            self.state.files[file_id] = (filename, fields.get("purpose", "batch"), content)
+        self._send(200, self._file_object(file_id))
+
+    def _file_object(self, file_id):
+        filename, purpose, content = self.state.files[file_id]
+        return {
+            "id": file_id, "object": "file", "bytes": len(content), "created_at": int(time.time()),
+            "filename": filename, "purpose": purpose, "status": "processed"
+        }
+
+    def _file_content(self, file_id):
+        with self.state.lock:
+            entry = self.state.files.get(file_id)
+        if entry is None:
+            return self._not_found()
+        self._send(200, entry[2], content_type="application/octet-stream")
+
+    def _create_openai_batch(self):
+        request = json.loads(self._read_body())
+        with self.state.lock:
+            entry = self.state.files.get(request.get("input_file_id"))
+            if entry is None:
+                return self._send(400, {"error": {"message": "input_file_id not found"}})
+            batch_id = self.state.new_id("batch")
+            requests = [json.loads(line) for line in entry[2].decode('utf-8').splitlines() if line.strip()]
+            self.state.batches[batch_id] = {
+                "provider": "openai", "requests": requests, "polls": 0,
+                "object": {
+                    "id": batch_id, "object": "batch", "endpoint": request.get("endpoint"),
+                    "input_file_id": request.get("input_file_id"),
+                    "completion_window": request.get("completion_window", "24h"),
+                    "status": "validating", "created_at": int(time.time()), "output_file_id": None,
+                    "error_file_id": None, "errors": None,
+                    "request_counts": {"total": len(requests), "completed": 0, "failed": 0}
+                }
+            }
+            self._send(200, self.state.batches[batch_id]["object"])
+
+    def _retrieve_openai_batch(self, batch_id):
+        with self.state.lock:
+            batch = self.state.batches.get(batch_id)
+            if batch is None or batch["provider"] != "openai":
+                return self._not_found()
+            batch["polls"] += 1
+            batch_object = batch["object"]
+            if batch["polls"] < self.state.polls:
+                batch_object["status"] = "in_progress"
+            elif batch_object["status"] != "completed":
+                self._finish_openai_batch(batch)
+            self._send(200, batch_object)
+
+    def _finish_openai_batch(self, batch):
+        lines, completed = [], 0
+        for request in batch["requests"]:
+            body = request.get("body", {})
+            user_message = next((m["content"] for m in body.get("messages", []) if m["role"] == "user"), "")
+            answer = self.state.answer(request["custom_id"], body.get("model"), user_message)
+            if answer is None:
+                response = {"status_code": 500, "request_id": request["custom_id"],
+                            "body": {"error": {"message": "stub failure"}}}
+            else:
+                completed += 1
+                response = {"status_code": 200, "request_id": request["custom_id"], "body": {
+                    "id": f"chatcmpl-{request['custom_id']}", "object": "chat.completion",
+                    "created": int(time.time()), "model": body.get("model"),
+                    "choices": [{"index": 0, "finish_reason": "stop",
+                                 "message": {"role": "assistant", "content": answer}}]
+                }}
+            lines.append(json.dumps({"id": f"batch_req_{request['custom_id']}",
+                                     "custom_id": request["custom_id"], "response": response, "error": None}))
+        file_id = self.state.new_id("file")
+        self.state.files[file_id] = ("batch_output.jsonl", "batch_output", "\n".join(lines).encode('utf-8'))
+        batch["object"].update({
+            "status": "completed", "output_file_id": file_id, "completed_at": int(time.time()),
+            "request_counts": {"total": len(lines), "completed": completed, "failed": len(lines) - completed}
+        })
+
+    # Anthropic: Message Batches
+
+    def _create_anthropic_batch(self):
+        request = json.loads(self._read_body())
+        with self.state.lock:
+            batch_id = self.state.new_id("msgbatch")
+            requests = request.get("requests", [])
+            self.state.batches[batch_id] = {
+                "provider": "anthropic", "requests": requests, "polls": 0, "results": None,
+                "object": {
+                    "id": batch_id, "type": "message_batch", "processing_status": "in_progress",
+                    "request_counts": {"processing": len(requests), "succeeded": 0, "errored": 0,
+                                       "canceled": 0, "expired": 0},
+                    "created_at": _iso_now(), "expires_at": _iso_now(), "ended_at": None,
+                    "cancel_initiated_at": None, "archived_at": None, "results_url": None
+                }
+            }
+            self._send(200, self.state.batches[batch_id]["object"])
+
+    def _retrieve_anthropic_batch(self, batch_id):
+        with self.state.lock:
+            batch = self.state.batches.get(batch_id)
+            if batch is None or batch["provider"] != "anthropic":
+                return self._not_found()
+            batch["polls"] += 1
+            if batch["polls"] >= self.state.polls and batch["results"] is None:
+                self._finish_anthropic_batch(batch)
+            self._send(200, batch["object"])
+
+    def _finish_anthropic_batch(self, batch):
+        lines, succeeded = [], 0
+        for request in batch["requests"]:
+            params = request.get("params", {})
+            user_message = next((m["content"] for m in params.get("messages", []) if m["role"] == "user"), "")
+            if isinstance(user_message, list):
+                user_message = " ".join(block.get("text", "") for block in user_message)
+            answer = self.state.answer(request["custom_id"], params.get("model"), user_message)
+            if answer is None:
+                result = {"type": "errored", "error": {"type": "error", "error": {
+                    "type": "api_error", "message": "stub failure"}}}
+            else:
+                succeeded += 1
+                result = {"type": "succeeded", "message": {
+                    "id": f"msg_{request['custom_id']}", "type": "message", "role": "assistant",
+                    "model": params.get("model"), "content": [{"type": "text", "text": answer}],
+                    "stop_reason": "end_turn", "stop_sequence": None,
+                    "usage": {"input_tokens": len(user_message) // 4, "output_tokens": len(answer) // 4}
+                }}
+            lines.append(json.dumps({"custom_id": request["custom_id"], "result": result}))
+        batch["results"] = "\n".join(lines).encode('utf-8')
+        host = self.headers.get("Host", f"127.0.0.1:{self.server.server_address[1]}")
+        batch["object"].update({
+            "processing_status": "ended", "ended_at": _iso_now(),
+            "results_url": f"http://{host}/v1/messages/batches/{batch['object']['id']}/results",
+            "request_counts": {"processing": 0, "succeeded": succeeded, "errored": len(lines) - succeeded,
+                               "canceled": 0, "expired": 0}
+        })
+
+    def _anthropic_results(self, batch_id):
+        with self.state.lock:
+            batch = self.state.batches.get(batch_id)
+            results = batch and batch.get("results")
+        if results is None:
+            return self._not_found()
+        self._send(200, results, content_type="application/binary")
+
+
+def make_server(host="127.0.0.1", port=8765, polls=1, fail_pattern=None):
+    server = ThreadingHTTPServer((host, port), BatchStubHandler)
+    server.state = BatchStubState(polls=polls, fail_pattern=fail_pattern)
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Local stand-in for the OpenAI / Anthropic batch APIs')
+    parser.add_argument('--host', default='127.0.0.1', help='Interface to listen on (default: 127.0.0.1)')
+    parser.add_argument('--port', type=int, default=8765, help='Port to listen on (default: 8765)')
+    parser.add_argument('--polls', type=int, default=1,
+                        help='Status checks before a batch reports it has finished (default: 1)')
+    parser.add_argument('--fail-pattern',
+                        help='Requests whose user message contains this text fail')
+    args = parser.parse_args()
+
+    server = make_server(args.host, args.port, args.polls, args.fail_pattern)
+    print(f"[INFO] Batch stub listening on http://{args.host}:{server.server_address[1]}")
+    print(f"[INFO] OPENAI_BASE_URL=http://{args.host}:{server.server_address[1]}/v1")
+    print(f"[INFO] ANTHROPIC_BASE_URL=http://{args.host}:{server.server_address[1]}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+import unittest
+
+from benchmark import MATCHER_KEYWORDS, generate_matcher_corpus, naive_is_excluded, naive_is_relevant
+from Lib.link_filter import EXCLUDED_PATTERNS, LinkMatcher
+
+
+class LinkMatcherParityTest(unittest.TestCase):
+    """LinkMatcher has to agree with the per-keyword any(... in url.lower()) checks it replaced."""
+
+    def assert_parity(self, keywords, urls):
+        matcher = LinkMatcher(keywords)
+        for url in urls:
+            with self.subTest(keywords=keywords, url=url):
+                self.assertEqual(matcher.is_excluded(url), naive_is_excluded(url, EXCLUDED_PATTERNS))
+                self.assertEqual(matcher.is_relevant(url), naive_is_relevant(url, keywords, EXCLUDED_PATTERNS))
+        self.assertEqual(matcher.filter_links(urls), (
+            [url for url in urls if not naive_is_excluded(url, EXCLUDED_PATTERNS)],
+            [url for url in urls if naive_is_relevant(url, keywords, EXCLUDED_PATTERNS)]
+        ))
+
+    def test_corpus(self):
+        urls = generate_matcher_corpus(2000)
+        for keywords in MATCHER_KEYWORDS:
+            self.assert_parity(keywords, urls)
+
+    def test_case(self):
+        urls = ["https://example.com/KI-News", "https://example.com/ki", "https://example.com/CHATGPT",
+                "https://example.com/Impressum", "https://example.com/STRASSE"]
+        self.assert_parity(["ki", "ChatGPT", "straße"], urls)
+        self.assert_parity(["KI", "İ"], urls)
+
+    def test_overlapping_keywords(self):
+        urls = ["https://example.com/openai", "https://example.com/ai", "https://example.com/kinder",
+                "https://example.com/llama-ai", "https://example.com/other"]
+        self.assert_parity(["ai", "openai", "open"], urls)
+        self.assert_parity(["ki", "kin", "kinder", "der"], urls)
+
+    def test_regex_metacharacters(self):
+        urls = ["https://example.com/c++", "https://example.com/cpp", "https://example.com/.net",
+                "https://example.com/xnet", "https://example.com/a.i", "https://example.com/abi",
+                "https://example.com/(beta)", "https://example.com/beta", "https://example.com/[x]",
+                "https://example.com/x", "https://example.com/a*b", "https://example.com/a|b"]
+        self.assert_parity(["c++", ".net", "a.i", "(beta)", "[x]", "*", "a|b", "\\d"], urls)
+
+    def test_no_keywords(self):
+        self.assert_parity([], ["https://example.com/ki", "https://example.com/impressum"])
+        self.assert_parity([""], ["https://example.com/ki", "https://example.com/impressum"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,64 @@
+import os
+import threading
+import unittest
+from unittest import mock
+
+from Lib.llm_batch import run_batch
+from Lib.pdf_audio_tools import clients
+from tests.batch_stub_server import make_server
+
+
+class RunBatchAgainstStubTest(unittest.TestCase):
+    """run_batch end to end through the real SDKs, against the local batch stub."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = make_server(port=0, polls=2, fail_pattern="FAIL")
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        base_url = f"http://127.0.0.1:{cls.server.server_address[1]}"
+        cls.environment = mock.patch.dict(os.environ, {
+            "OPENAI_BASE_URL": f"{base_url}/v1",
+            "OPENAI_API_KEY": "stub",
+            "ANTHROPIC_BASE_URL": base_url,
+            "ANTHROPIC_API_KEY": "stub"
+        })
+        cls.environment.start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.environment.stop()
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        # The shared SDK clients read their base URL when they are created
+        for name in ("_openai_client", "_anthropic_client"):
+            patcher = mock.patch.object(clients, name, None)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def check_provider(self, provider):
+        prompts = [
+            ("system", "first request"),
+            ("system", "second request, FAIL on purpose"),
+            ("system", "third request")
+        ]
+        answers = run_batch(provider, "stub-model", prompts, poll_interval=0.01)
+        self.assertEqual(len(answers), len(prompts))
+        self.assertTrue(answers[0].startswith("Stub answer for request-0 from stub-model"))
+        self.assertIn("first request", answers[0])
+        self.assertIsNone(answers[1])
+        self.assertIn("third request", answers[2])
+
+    def test_openai(self):
+        self.check_provider("openai")
+
+    def test_anthropic(self):
+        self.check_provider("anthropic")
+
+    def test_no_prompts(self):
+        self.assertEqual(run_batch("openai", "stub-model", []), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,51 @@
+import datetime
+import os
+import tempfile
+import unittest
+
+from Lib.novelty import NoveltyIndex
+
+
+class NoveltyIndexTest(unittest.TestCase):
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+
+    def test_recorded_lines_are_dropped(self):
+        index = NoveltyIndex(self.directory, lines_per_day=1000)
+        self.assertEqual(index.new_lines("alpha\nbeta"), "alpha\nbeta")
+        index.record("alpha")
+        self.assertEqual(index.new_lines(" alpha \n\nbeta\ngamma"), "beta\ngamma")
+
+    def test_nothing_is_recorded_before_record(self):
+        index = NoveltyIndex(self.directory, lines_per_day=1000)
+        index.new_lines("alpha")
+        self.assertEqual(index.new_lines("alpha"), "alpha")
+
+    def test_repeated_lines_are_kept(self):
+        index = NoveltyIndex(self.directory, lines_per_day=1000)
+        self.assertEqual(index.new_lines("Mehr lesen\nalpha\nMehr lesen"), "Mehr lesen\nalpha\nMehr lesen")
+
+    def test_saved_filters_are_loaded(self):
+        index = NoveltyIndex(self.directory, lines_per_day=1000)
+        index.record("alpha")
+        index.save()
+        self.assertEqual(NoveltyIndex(self.directory, lines_per_day=1000).new_lines("alpha\nbeta"), "beta")
+
+    def test_corrupt_filter_is_started_over(self):
+        index = NoveltyIndex(self.directory, lines_per_day=1000)
+        index.record("alpha")
+        index.save()
+        path = os.path.join(self.directory, f"{datetime.date.today().isoformat()}.bloom")
+        with open(path, 'r+b') as f:
+            f.truncate(20)
+        index = NoveltyIndex(self.directory, lines_per_day=1000)
+        self.assertEqual(index.new_lines("alpha"), "alpha")
+        index.save()
+        self.assertGreater(os.path.getsize(path), 20)
+
+
+if __name__ == "__main__":
+    unittest.main()
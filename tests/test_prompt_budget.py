@@ -0,0 +1,38 @@
+import unittest
+
+from Lib.prompt_budget import count_tokens, pack_lines, take_batches
+
+
+class TakeBatchesTest(unittest.TestCase):
+
+    def test_everything_fits(self):
+        text = "first line\nsecond line"
+        self.assertEqual(take_batches(text, 50, 2), (text, ""))
+
+    def test_rest_starts_at_a_whole_line(self):
+        lines = [f"line {i} " + "word " * 20 for i in range(30)]
+        text = "\n".join(lines)
+        head, rest = take_batches(text, 40, 3)
+        self.assertLessEqual(len(pack_lines(head, 40)), 3)
+        self.assertEqual(head.split("\n") + rest.split("\n"), lines)
+
+    def test_single_oversized_line(self):
+        oversized = "word " * 2000
+        head, rest = take_batches(oversized + "\nnext line", 20, 3)
+        self.assertTrue(head)
+        self.assertTrue(oversized.startswith(head))
+        self.assertLessEqual(count_tokens(head), 3 * 20)
+        self.assertEqual(rest, "next line")
+
+    def test_single_oversized_line_alone(self):
+        head, rest = take_batches("word " * 2000, 20, 3)
+        self.assertTrue(head)
+        self.assertEqual(rest, "")
+
+    def test_max_tokens_below_one(self):
+        with self.assertRaises(ValueError):
+            pack_lines("text", 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
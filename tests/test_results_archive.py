@@ -0,0 +1,40 @@
+import os
+import tempfile
+import time
+import unittest
+
+from Lib.results_archive import ResultsArchive
+
+
+class ResultsArchiveTest(unittest.TestCase):
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.archive = ResultsArchive(os.path.join(directory.name, "archive.sqlite"))
+        self.addCleanup(self.archive.close)
+        self.run_id = self.archive.start_run('news', time.time(), {"categories": {}})
+
+    def news_result(self, analysis):
+        return {"url": "https://example.com/news", "keywords": ["AI"], "category": "KI",
+                "analysis": analysis, "error": None}
+
+    def test_search_terms_are_quoted(self):
+        self.archive.record(self.run_id, 0, self.news_result("GPT-4o beats C++ code"))
+        self.assertEqual(len(self.archive.search("gpt-4o")), 1)
+        self.assertEqual(len(self.archive.search("c++")), 1)
+        self.assertEqual(len(self.archive.search("gpt OR nothing", raw=True)), 1)
+
+    def test_recording_again_replaces_the_analyses(self):
+        self.archive.record(self.run_id, 0, self.news_result("first llama analysis"))
+        self.archive.record(self.run_id, 0, self.news_result("second llama analysis"))
+        hits = self.archive.search("llama")
+        self.assertEqual(len(hits), 1)
+        self.assertIn("second", hits[0]["snippet"])
+        self.assertEqual(self.archive.search("first"), [])
+        _, _, _, results = self.archive.load_run(self.run_id)
+        self.assertEqual([result["analysis"] for result in results], ["second llama analysis"])
+
+
+if __name__ == "__main__":
+    unittest.main()